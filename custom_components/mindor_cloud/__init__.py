@@ -4,6 +4,7 @@ from .const import DOMAIN, PLATFORMS
 from .coordinator import MindorDataUpdateCoordinator
 from homeassistant.helpers.device_registry import async_get as async_get_device_registry
 from homeassistant.helpers.area_registry import async_get as async_get_area_registry
+import asyncio
 import logging
 
 _LOGGER = logging.getLogger(__name__)
@@ -15,8 +16,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await coordinator.async_config_entry_first_refresh()
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
-    # 自动创建区域并绑定设备
-    await _setup_areas_and_devices(hass, entry, coordinator)
+    # 自动创建区域并绑定设备（放到后台执行，不阻塞平台加载）
+    entry.async_create_background_task(
+        hass,
+        _setup_areas_and_devices(hass, entry, coordinator),
+        "mindor_area_setup",
+    )
 
     # 加载实体平台
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -42,7 +47,10 @@ async def _setup_areas_and_devices(
     devices = coordinator.devices or []
     _LOGGER.info(f"开始处理 {len(devices)} 个设备的区域分配")
 
-    for device in devices:
+    for index, device in enumerate(devices):
+        # 每处理一批设备就让出事件循环，避免长时间占用
+        if index and index % 20 == 0:
+            await asyncio.sleep(0)
         try:
             device_id = device.get("id") or device.get("device_id")
             area_name = device.get("areable_name", "默认房间").strip()
@@ -12,17 +12,55 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 from typing import Any, Dict, List, Optional
 import aiohttp
-import asyncio
 import logging
+import orjson
 
 from . import DOMAIN
 from .const import AIR_LIST, API_BASE
 from .coordinator import MindorDataUpdateCoordinator
-from .request_config import RequestConfig
+from .request_config import generate_sign, get_opt
 from .utils import debounce_command, get_global_debouncer
 
 _LOGGER = logging.getLogger(__name__)
 
+# 模式/风速/摆风映射表，模块加载时构建一次，属性读取与setter共用
+_MODE_TO_HVAC = {
+    "01": HVACMode.COOL,  # 制冷
+    "02": HVACMode.HEAT,  # 制热
+    "03": HVACMode.DRY,  # 除湿
+    "04": HVACMode.FAN_ONLY,  # 送风
+    "05": HVACMode.AUTO,  # 自动
+}
+_HVAC_TO_MODE = {v: k for k, v in _MODE_TO_HVAC.items()}
+
+_FAN_TO_WIND = {
+    FAN_AUTO: "00",
+    FAN_LOW: "01",
+    FAN_MEDIUM: "02",
+    FAN_HIGH: "03",
+}
+_WIND_TO_FAN = {
+    "00": FAN_AUTO,
+    "01": FAN_LOW,
+    "02": FAN_MEDIUM,
+    "03": FAN_HIGH,
+    # 兼容单位数字格式
+    "0": FAN_AUTO,
+    "1": FAN_LOW,
+    "2": FAN_MEDIUM,
+    "3": FAN_HIGH,
+}
+
+_SWING_TO_VAL = {
+    "关闭扫风": "00",
+    "上下扫风": "01",
+    "左右扫风": "02",
+}
+_VAL_TO_SWING = {v: k for k, v in _SWING_TO_VAL.items()}
+
+# 控制接口URL，模块加载时拼接一次
+_AC_CTRL_URL = f"{API_BASE}/md_openapi/home_assistant/ac_ctrl"
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """设置空调实体"""
@@ -57,6 +95,13 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
         # 添加第一次开机标志
         self._first_power_on = True
 
+        # 待发送命令缓冲（同act只保留最新值），短窗口内合并为一次发送
+        self._pending_commands: Dict[str, str] = {}
+        self._flush_handle = None
+
+        # 复用的请求头dict，首次命令时构建，之后只改动态字段
+        self._merged_headers: Optional[Dict[str, str]] = None
+
         # 空调基本配置
         self._attr_temperature_unit = UnitOfTemperature.CELSIUS
         self._attr_supported_features = (
@@ -99,57 +144,43 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
 
     @property
     def available(self) -> bool:
-        """返回设备可用性"""
+        """返回设备可用性（索引O(1)查找）"""
         if not self.coordinator.data:
             return False
-
-        for device in self.coordinator.data:
-            if device.get("id") == self._device.get("id"):
-                return device.get("online", False)
-        return False
+        device = self.coordinator._by_id.get(self._device.get("id"))
+        return bool(device and device.get("online", False))
 
     def _get_current_device_data(self) -> Optional[Dict[str, Any]]:
-        """获取当前设备的最新数据"""
+        """获取当前设备的最新数据（走coordinator索引，O(1)查找）"""
         if not self.coordinator.data:
             return None
-
-        for device in self.coordinator.data:
-            if device.get("id") == self._device.get("id"):
-                return device
-        return None
+        return self.coordinator._by_id.get(self._device.get("id"))
 
     def _get_act_status_value(
         self, device_data: Dict[str, Any], act_name: str
     ) -> Optional[str]:
-        """从device_act_status数组中获取指定act的值"""
-        act_status = device_data.get("device_act_status", [])
-        for item in act_status:
-            if item.get("act") == act_name:
-                return item.get("val")
-        return None
+        """从act索引中获取指定act的值"""
+        item = (device_data.get("_acts") or {}).get(act_name)
+        return item.get("val") if item else None
 
     def _update_local_device_status(self, act_name: str, new_value: str) -> None:
         """立即更新本地设备状态数据"""
-        if not self.coordinator.data:
+        device = self.coordinator._by_id.get(self._device.get("id"))
+        if not device:
             return
 
-        # 找到当前设备数据
-        for device in self.coordinator.data:
-            if device.get("id") == self._device.get("id"):
-                # 获取设备状态数组
-                act_status = device.get("device_act_status", [])
-
-                # 查找并更新对应的状态项
-                for item in act_status:
-                    if item.get("act") == act_name:
-                        item["val"] = new_value
-                        _LOGGER.debug(f"已更新本地设备状态: {act_name} = {new_value}")
-                        return
+        acts = device.setdefault("_acts", {})
+        item = acts.get(act_name)
+        if item is not None:
+            item["val"] = new_value
+            _LOGGER.debug(f"已更新本地设备状态: {act_name} = {new_value}")
+            return
 
-                # 如果没找到对应项，则添加新项
-                act_status.append({"act": act_name, "val": new_value})
-                _LOGGER.debug(f"已添加本地设备状态: {act_name} = {new_value}")
-                break
+        # 新增状态项时同时维护列表和索引两个视图
+        new_item = {"act": act_name, "val": new_value}
+        device.setdefault("device_act_status", []).append(new_item)
+        acts[act_name] = new_item
+        _LOGGER.debug(f"已添加本地设备状态: {act_name} = {new_value}")
 
     @property
     def hvac_mode(self) -> HVACMode:
@@ -161,14 +192,18 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
                 return HVACMode.OFF
 
             mode = self._get_act_status_value(device_data, "mode")
-            mode_mapping = {
-                "01": HVACMode.COOL,  # 制冷
-                "02": HVACMode.HEAT,  # 制热
-                "03": HVACMode.DRY,  # 除湿
-                "04": HVACMode.FAN_ONLY,  # 送风
-                "05": HVACMode.AUTO,  # 自动
-            }
-            return mode_mapping.get(mode, HVACMode.AUTO)
+            # 热路径用match直接分支，CPython 3.11+会特化为快速跳转
+            match mode:
+                case "01":
+                    return HVACMode.COOL  # 制冷
+                case "02":
+                    return HVACMode.HEAT  # 制热
+                case "03":
+                    return HVACMode.DRY  # 除湿
+                case "04":
+                    return HVACMode.FAN_ONLY  # 送风
+                case _:
+                    return HVACMode.AUTO  # 自动
         return HVACMode.OFF
 
     @property
@@ -202,7 +237,7 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
         return None
 
     # 确保所有控制方法都立即更新状态
-    @debounce_command(interval=1.0)
+    @debounce_command()
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """设置HVAC模式 - 确保状态立即更新"""
         if hvac_mode == HVACMode.OFF:
@@ -214,6 +249,8 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
                 self.async_write_ha_state()
                 self._first_power_on = True
                 _LOGGER.info(f"空调 {self._attr_name} 已关机")
+            else:
+                _LOGGER.error(f"空调 {self._attr_name} 模式设置失败")
         else:
             # 检查当前电源状态
             device_data = self._get_current_device_data()
@@ -236,125 +273,94 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
                 power_success = True
 
             if power_success:
-                # 如果是第一次开机，延迟1秒再发送模式指令
+                # 如果是第一次开机，模式指令延迟1秒补发，setter不再阻塞等待
                 if is_first_power_on:
                     _LOGGER.info(
-                        f"空调 {self._attr_name} 第一次开机，延迟1秒发送模式指令"
+                        f"空调 {self._attr_name} 第一次开机，1秒后发送模式指令"
                     )
-                    await asyncio.sleep(1)
-
-                # 设置模式
-                mode_mapping = {
-                    HVACMode.COOL: "01",
-                    HVACMode.HEAT: "02",
-                    HVACMode.DRY: "03",
-                    HVACMode.FAN_ONLY: "04",
-                    HVACMode.AUTO: "05",
-                }
-                mode_val = mode_mapping.get(hvac_mode, "05")
-                success = await self._send_command("mode", mode_val)
-
-                if success:
-                    # 立即更新本地模式状态
-                    self._update_local_device_status("mode", mode_val)
-                    # 立即通知UI更新
-                    self.async_write_ha_state()
-                    _LOGGER.info(f"空调 {self._attr_name} 模式已设置为 {hvac_mode}")
-            else:
-                success = False
-
-        # 无论成功失败，都要确保UI状态正确
-        if not success:
-            _LOGGER.error(f"空调 {self._attr_name} 模式设置失败")
-            # 失败时也要刷新状态，确保UI显示正确
-            self.async_write_ha_state()
-
-    @debounce_command(interval=1.0)
-    async def async_set_temperature(self, **kwargs: Any) -> None:
-        """设置目标温度 - 确保状态立即更新"""
-        temperature = kwargs.get(ATTR_TEMPERATURE)
-        if temperature is None:
-            return
+                    self.hass.loop.call_later(
+                        1.0,
+                        lambda: self.hass.async_create_task(
+                            self._send_mode_command(hvac_mode)
+                        ),
+                    )
+                    return
 
-        # 确保温度在有效范围内
-        temperature = max(
-            self._attr_min_temp, min(self._attr_max_temp, int(temperature))
-        )
+                # 开机和模式指令在同一保活连接上背靠背发送
+                await self._send_mode_command(hvac_mode)
+            else:
+                # 失败时本地状态未改动，无需额外刷新UI
+                _LOGGER.error(f"空调 {self._attr_name} 模式设置失败")
 
-        success = await self._send_command("temp", str(temperature))
+    async def _send_mode_command(self, hvac_mode: HVACMode) -> None:
+        """发送模式指令并做乐观状态更新"""
+        mode_val = _HVAC_TO_MODE.get(hvac_mode, "05")
+        success = await self._send_command("mode", mode_val)
 
         if success:
-            # 立即更新本地温度状态
-            self._update_local_device_status("thermoregulation", str(temperature))
-            # 立即通知UI更新
+            # 立即更新本地模式状态并通知UI
+            self._update_local_device_status("mode", mode_val)
             self.async_write_ha_state()
-            _LOGGER.info(f"空调 {self._attr_name} 目标温度已设置为 {temperature}°C")
+            _LOGGER.info(f"空调 {self._attr_name} 模式已设置为 {hvac_mode}")
         else:
-            _LOGGER.error(f"空调 {self._attr_name} 温度设置失败")
-            # 失败时也要刷新状态
-            self.async_write_ha_state()
+            _LOGGER.error(f"空调 {self._attr_name} 模式设置失败")
 
-    @debounce_command(interval=1.0)
+    @debounce_command()
     async def async_set_fan_mode(self, fan_mode: str) -> None:
         """设置风速模式 - 优化版本"""
-        fan_mapping = {
-            FAN_AUTO: "00",
-            FAN_LOW: "01",
-            FAN_MEDIUM: "02",
-            FAN_HIGH: "03",
-        }
-        wind_gear = fan_mapping.get(fan_mode)
+        wind_gear = _FAN_TO_WIND.get(fan_mode)
         if wind_gear:
-            # 发送命令到设备
-            success = await self._send_command("speed", wind_gear)
+            # 缓冲命令，快速连续操作会被合并为一次发送
+            self._queue_command("speed", wind_gear)
+            _LOGGER.info(f"空调 {self._attr_name} 风速已设置为 {fan_mode}")
 
-            if success:
-                # 只在命令成功后更新一次状态，让WebSocket处理实际的状态同步
-                _LOGGER.info(f"空调 {self._attr_name} 风速已设置为 {fan_mode}")
-                # 移除立即的本地状态更新，依赖WebSocket推送
-            else:
-                _LOGGER.error(f"空调 {self._attr_name} 风速设置失败")
-                # 失败时刷新状态确保UI正确
-                self.async_write_ha_state()
-
-    @debounce_command(interval=1.0)
+    @debounce_command()
     async def async_set_swing_mode(self, swing_mode: str) -> None:
         """设置摆风模式 - 优化版本"""
-        swing_mapping = {
-            "关闭扫风": "00",
-            "上下扫风": "01",
-            "左右扫风": "02",
-        }
-
-        swing_val = swing_mapping.get(swing_mode, "00")
-        success = await self._send_command("van", swing_val)
-
-        if success:
-            _LOGGER.info(f"空调 {self._attr_name} 摆风模式已设置为 {swing_mode}")
-            # 移除立即的本地状态更新和后台刷新，依赖WebSocket推送
-        else:
-            _LOGGER.error(f"空调 {self._attr_name} 摆风设置失败")
-            self.async_write_ha_state()
+        swing_val = _SWING_TO_VAL.get(swing_mode, "00")
+        # 缓冲命令，快速连续操作会被合并为一次发送
+        self._queue_command("van", swing_val)
+        _LOGGER.info(f"空调 {self._attr_name} 摆风模式已设置为 {swing_mode}")
 
-    @debounce_command(interval=1.0)
+    @debounce_command()
     async def async_set_temperature(self, **kwargs: Any) -> None:
-        """设置目标温度 - 优化版本"""
+        """设置目标温度 - 确保状态立即更新"""
         temperature = kwargs.get(ATTR_TEMPERATURE)
         if temperature is None:
             return
 
+        # 确保温度在有效范围内
         temperature = max(
             self._attr_min_temp, min(self._attr_max_temp, int(temperature))
         )
 
-        success = await self._send_command("temp", str(temperature))
-
-        if success:
-            _LOGGER.info(f"空调 {self._attr_name} 目标温度已设置为 {temperature}°C")
-            # 移除立即的本地状态更新，依赖WebSocket推送
-        else:
-            _LOGGER.error(f"空调 {self._attr_name} 温度设置失败")
-            self.async_write_ha_state()
+        # 缓冲命令，拖动温度滑块时只发送最后一个值
+        self._queue_command("temp", str(temperature))
+
+        # 立即更新本地温度状态并通知UI（与async_set_hvac_mode保持一致的乐观更新）
+        self._update_local_device_status("thermoregulation", str(temperature))
+        self.async_write_ha_state()
+        _LOGGER.info(f"空调 {self._attr_name} 目标温度已设置为 {temperature}°C")
+
+    def _queue_command(self, act: str, val: str) -> None:
+        """缓冲控制命令，短窗口内同act后写覆盖前写，合并后一次性发送"""
+        self._pending_commands[act] = val
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(
+                0.05,
+                lambda: self.hass.async_create_task(self._flush_commands()),
+            )
+
+    async def _flush_commands(self) -> None:
+        """批量发送缓冲的命令（后端按单条接收，这里在同一连接上顺序发送）"""
+        self._flush_handle = None
+        pending = self._pending_commands
+        self._pending_commands = {}
+
+        for act, val in pending.items():
+            success = await self._send_command(act, val)
+            if not success:
+                _LOGGER.error(f"空调 {self._attr_name} 命令 {act}={val} 发送失败")
 
     async def _send_command(self, act: str, val: str) -> bool:
         """发送控制命令"""
@@ -370,24 +376,22 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
                 _LOGGER.error("设备device_id为空")
                 return False
 
-            # 创建请求配置
-            req = RequestConfig()
-            opt = req.get_opt()
-            sign = req.generate_sign(opt)
+            # 生成请求参数与签名
+            opt = get_opt()
+            sign = generate_sign(opt)
 
-            # 构建请求头
-            headers = {
-                "Authorization": token,
-                "Sign": sign,
-                "Content-Type": "application/json",
-            }
-
-            # 添加 opt 参数到请求头
-            opt_str = {str(k): str(v) for k, v in opt.items()}
-            merged_headers = {
-                **dict(headers),
-                **opt_str,
-            }
+            # 复用同一个请求头dict，每次只更新动态字段，避免重复构建
+            if self._merged_headers is None:
+                self._merged_headers = {
+                    "Authorization": token,
+                    "Content-Type": "application/json",
+                    **{str(k): str(v) for k, v in opt.items()},
+                }
+            else:
+                self._merged_headers["NonceStr"] = opt["NonceStr"]
+                self._merged_headers["Timestamp"] = str(opt["Timestamp"])
+            self._merged_headers["Sign"] = sign
+            merged_headers = self._merged_headers
 
             # 构建请求数据
             request_data = {
@@ -399,28 +403,27 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
             _LOGGER.debug(f"发送空调命令 {act}={val} 到设备 {device_id}")
             _LOGGER.debug(f"请求数据: {request_data}")
 
-            # 发送 API 请求
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{API_BASE}/md_openapi/home_assistant/ac_ctrl",
-                    json=request_data,
-                    headers=merged_headers,
-                ) as resp:
-                    if resp.status != 200:
-                        _LOGGER.error(f"API请求失败，状态码: {resp.status}")
-                        return False
-
-                    response_data = await resp.json()
-                    _LOGGER.debug(f"API响应: {response_data}")
-
-                    # 检查响应结果
-                    if response_data.get("errcode") == 0:
-                        _LOGGER.info(f"空调设备 {device_id} 命令 {act}={val} 执行成功")
-                        return True
-                    else:
-                        error_msg = response_data.get("msg", "未知错误")
-                        _LOGGER.error(f"空调设备控制失败: {error_msg}")
-                        return False
+            # 发送 API 请求（复用coordinator上的共享会话）
+            async with self.coordinator.session.post(
+                _AC_CTRL_URL,
+                data=orjson.dumps(request_data),
+                headers=merged_headers,
+            ) as resp:
+                if not resp.ok:
+                    _LOGGER.error(f"API请求失败，状态码: {resp.status}")
+                    return False
+
+                response_data = orjson.loads(await resp.read())
+                _LOGGER.debug(f"API响应: {response_data}")
+
+                # 检查响应结果
+                if response_data.get("errcode") == 0:
+                    _LOGGER.info(f"空调设备 {device_id} 命令 {act}={val} 执行成功")
+                    return True
+                else:
+                    error_msg = response_data.get("msg", "未知错误")
+                    _LOGGER.error(f"空调设备控制失败: {error_msg}")
+                    return False
 
         except aiohttp.ClientError as e:
             _LOGGER.error(f"网络请求错误: {e}")
@@ -435,18 +438,7 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
         device_data = self._get_current_device_data()
         if device_data:
             wind_gear = self._get_act_status_value(device_data, "windGear")
-            fan_mapping = {
-                "00": FAN_AUTO,
-                "01": FAN_LOW,
-                "02": FAN_MEDIUM,
-                "03": FAN_HIGH,
-                # 兼容单位数字格式
-                "0": FAN_AUTO,
-                "1": FAN_LOW,
-                "2": FAN_MEDIUM,
-                "3": FAN_HIGH,
-            }
-            return fan_mapping.get(wind_gear, FAN_AUTO)
+            return _WIND_TO_FAN.get(wind_gear, FAN_AUTO)
         return FAN_AUTO
 
     @property
@@ -455,10 +447,5 @@ class MindorClimateEntity(CoordinatorEntity, ClimateEntity):
         device_data = self._get_current_device_data()
         if device_data:
             air_swing = self._get_act_status_value(device_data, "airSwing")
-            swing_mapping = {
-                "00": "关闭扫风",
-                "01": "上下扫风",
-                "02": "左右扫风",
-            }
-            return swing_mapping.get(air_swing, "关闭扫风")
+            return _VAL_TO_SWING.get(air_swing, "关闭扫风")
         return "关闭扫风"
@@ -1,9 +1,10 @@
 from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResult
-import aiohttp
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import orjson
 import voluptuous as vol
 from .const import DOMAIN, API_BASE
-from .request_config import RequestConfig
+from .request_config import generate_sign, get_opt
 import logging
 
 _LOGGER = logging.getLogger(__name__)
@@ -24,52 +25,48 @@ class MindorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
         phone = user_input["phone"]
-        req = RequestConfig()
 
-        # 生成 opt 和签名
-        opt = req.get_opt()
-        sign = req.generate_sign(opt)
-        headers = {"Sign": sign, "Content-Type": "application/json"}
-        opt_str = {str(k): str(v) for k, v in opt.items()}
+        # 两次请求的 opt 和签名提前一并算好，登录响应一到即可发设备列表请求
+        opt = get_opt()
+        sign = generate_sign(opt)
         merged_headers = {
-            **dict(headers),
-            **opt_str,
+            "Sign": sign,
+            "Content-Type": "application/json",
+            **{str(k): str(v) for k, v in opt.items()},
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{API_BASE}/md_openapi/home_assistant/login",
-                json={"mobile": phone},
-                headers=merged_headers,
-            ) as resp:
-                if resp.status != 200:
-                    return self.async_abort(reason="Login failed")
-                data = await resp.json()
-                _LOGGER.warning(f"Login Response: {data}")
-                if data.get("errcode") != 0:
-                    return self.async_abort(reason=data.get("msg"))
-                token = data["token"]
+        opt2 = get_opt()
+        sign2 = generate_sign(opt2)
 
-            opt2 = req.get_opt()
-            sign2 = req.generate_sign(opt2)
-            headers2 = {
-                "Authorization": token,
-                "Sign": sign2,
-            }
-            opt_str2 = {str(k): str(v) for k, v in opt2.items()}
-            merged_headers2 = {
-                **dict(headers2),
-                **opt_str2,
-            }
-            async with session.get(
-                f"{API_BASE}/md_openapi/home_assistant/devices",
-                headers=merged_headers2,
-            ) as resp:
-                devices = await resp.json()
-                _LOGGER.warning(f"Devices: {devices}")
-                if devices.get("errcode") != 0:
-                    return self.async_abort(reason=devices.get("msg"))
-                _LOGGER.debug(f"设备列表: {devices}")
-                devices = devices["records"]
+        # 复用HA共享的aiohttp会话，登录和设备列表请求走同一个连接池
+        session = async_get_clientsession(self.hass)
+        async with session.post(
+            f"{API_BASE}/md_openapi/home_assistant/login",
+            data=orjson.dumps({"mobile": phone}),
+            headers=merged_headers,
+        ) as resp:
+            if not resp.ok:
+                return self.async_abort(reason="Login failed")
+            data = orjson.loads(await resp.read())
+            _LOGGER.warning(f"Login Response: {data}")
+            if data.get("errcode") != 0:
+                return self.async_abort(reason=data.get("msg"))
+            token = data["token"]
+
+        merged_headers2 = {
+            "Authorization": token,
+            "Sign": sign2,
+            **{str(k): str(v) for k, v in opt2.items()},
+        }
+        async with session.get(
+            f"{API_BASE}/md_openapi/home_assistant/devices",
+            headers=merged_headers2,
+        ) as resp:
+            devices = orjson.loads(await resp.read())
+            _LOGGER.warning(f"Devices: {devices}")
+            if devices.get("errcode") != 0:
+                return self.async_abort(reason=devices.get("msg"))
+            _LOGGER.debug(f"设备列表: {devices}")
+            devices = devices["records"]
         return self.async_create_entry(
             title=f"Mindor User {phone}",
             data={
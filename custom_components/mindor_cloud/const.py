@@ -2,24 +2,27 @@ DOMAIN = "mindor_cloud"
 PLATFORMS = ["switch", "climate", "cover", "sensor"]
 # 普通插座
 
-SOCKET_LIST = ["BCZ006", "BDQ001", "XCZ006", "DDQ001", "DCZ006", "ZCZ004", "TDQ002"]
+SOCKET_LIST = frozenset(
+    {"BCZ006", "BDQ001", "XCZ006", "DDQ001", "DCZ006", "ZCZ004", "TDQ002"}
+)
 # 电量款插座
-SOCKET_POWER_LIST = [
-    "BCZ001",
-    "BPS001",
-    "ZCZ001",
-    "ZCZ001",
-    "ZCQ001",
-    "HPS001",
-    "ZCZ003",
-    "ZCZ002",
-    "XPS001",
-    "XCZ001",
-]
+SOCKET_POWER_LIST = frozenset(
+    {
+        "BCZ001",
+        "BPS001",
+        "ZCZ001",
+        "ZCQ001",
+        "HPS001",
+        "ZCZ003",
+        "ZCZ002",
+        "XPS001",
+        "XCZ001",
+    }
+)
 # 空调伴侣
-AIR_LIST = ["BPS004", "KTY006", "CPS004"]
+AIR_LIST = frozenset({"BPS004", "KTY006", "CPS004"})
 # 窗帘电机
-CURTAIN_LIST = ["WCT001"]
+CURTAIN_LIST = frozenset({"WCT001"})
 
 
 API_BASE = "https://lock1.wangjile.cn"
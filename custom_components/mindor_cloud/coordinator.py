@@ -1,15 +1,101 @@
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.core import HomeAssistant
-from datetime import timedelta
-import aiohttp
-from .const import API_BASE
-from .request_config import RequestConfig
+from datetime import datetime, timedelta
+import orjson
+from .const import API_BASE, SOCKET_LIST, SOCKET_POWER_LIST, AIR_LIST, CURTAIN_LIST
+from .request_config import get_opt, generate_sign
 from .websocket_client import MindorWebSocketClient
+from .utils import safe_float
+from time import monotonic
 
 import logging
 
 _LOGGER = logging.getLogger(__name__)
 
+# 签名请求头的缓存有效期（秒）
+_SIGN_TTL = 30.0
+
+# 模式/摆风/风速代码对应的可读名称，模块级常量避免每条消息重建
+_MODE_NAMES = {
+    "01": "制冷",
+    "02": "制热",
+    "03": "除湿",
+    "04": "送风",
+    "05": "自动",
+}
+_SWING_NAMES = {
+    "00": "关闭扫风",
+    "01": "上下扫风",
+    "02": "左右扫风",
+}
+_WIND_NAMES = {
+    "00": "自动",
+    "01": "低速",
+    "02": "中速",
+    "03": "高速",
+}
+
+
+def _handle_source(coordinator, device, device_id, act_val):
+    """插座开关状态"""
+    is_on = act_val != "off"
+    device["l1_state"] = is_on
+    _LOGGER.info("设备 %s 开关状态更新为: %s", device_id, is_on)
+
+
+def _handle_power(coordinator, device, device_id, act_val):
+    """电量款插座的实时功率"""
+    power_value = safe_float(act_val)
+    coordinator._update_act_status(device, "power", act_val)
+    coordinator._accumulate_energy(device)
+    _LOGGER.info("插座 %s 实时功率更新为: %sW", device_id, power_value)
+
+
+def _handle_thermoregulation(coordinator, device, device_id, act_val):
+    """空调温度调节 - 更新device_act_status数组"""
+    coordinator._update_act_status(device, "thermoregulation", act_val)
+    _LOGGER.info("空调 %s 目标温度更新为: %s°C", device_id, act_val)
+
+
+def _handle_mode(coordinator, device, device_id, act_val):
+    """空调模式切换 - 更新device_act_status数组"""
+    coordinator._update_act_status(device, "mode", act_val)
+    mode_name = _MODE_NAMES.get(act_val, f"模式{act_val}")
+    _LOGGER.info("空调 %s 模式更新为: %s", device_id, mode_name)
+
+
+def _handle_air_swing(coordinator, device, device_id, act_val):
+    """空调摆风控制 - 更新device_act_status数组"""
+    coordinator._update_act_status(device, "airSwing", act_val)
+    swing_name = _SWING_NAMES.get(act_val, f"摆风{act_val}")
+    _LOGGER.info("空调 %s 摆风状态更新为: %s", device_id, swing_name)
+
+
+def _handle_wind_gear(coordinator, device, device_id, act_val):
+    """空调风速控制 - 更新device_act_status数组"""
+    coordinator._update_act_status(device, "windGear", act_val)
+    wind_name = _WIND_NAMES.get(act_val, f"风速{act_val}")
+    _LOGGER.info("空调 %s 风速更新为: %s", device_id, wind_name)
+
+
+def _handle_on(coordinator, device, device_id, act_val):
+    """空调开关状态"""
+    coordinator._update_act_status(device, "On", act_val)
+    _LOGGER.info("空调 %s 开关状态更新为: %s", device_id, act_val)
+
+
+# act -> 处理函数 的分发表，一次哈希查找替代逐个字符串比较
+_ACT_DISPATCH = {
+    "source": _handle_source,
+    "power": _handle_power,
+    "thermoregulation": _handle_thermoregulation,
+    "mode": _handle_mode,
+    "airSwing": _handle_air_swing,
+    "windGear": _handle_wind_gear,
+    "On": _handle_on,
+}
+
 
 class MindorDataUpdateCoordinator(DataUpdateCoordinator):
     def __init__(self, hass: HomeAssistant, entry):
@@ -17,17 +103,122 @@ class MindorDataUpdateCoordinator(DataUpdateCoordinator):
         self.token = entry.data["token"]
         self.devices = entry.data["devices"]
         self.user_id = entry.data["user_id"]
+        # 复用HA共享的aiohttp会话，避免每次请求重建TCP+TLS连接
+        self.session = async_get_clientsession(hass)
         self.websocket_url = "wss://lock.wangjile.cn/cable"
         self.websocket_client: MindorWebSocketClient = None
         self.real_time_enabled = True
+        # id -> 设备dict 的索引，初始化及每次刷新后重建，供实体O(1)查找
+        self._by_id = {}
+        # (生成时刻, 签名请求头) 缓存，短TTL内命令突发复用同一签名
+        self._sig_cache = None
+        # WebSocket消息突发合并：脏设备集合 + 下一tick统一派发的句柄
+        self._dirty_ids = set()
+        self._flush_handle = None
+        # 平台桶名 -> 设备列表，刷新时一次分桶，各平台setup直接取用
+        self._devices_by_platform = {}
+        # 数据代次计数，实体用它判断缓存的派生值是否仍然有效
+        self.update_id = 0
+        # device_id -> (上次功率, 上次monotonic时刻, 运行期累计kWh)
+        self._energy_acc = {}
+        # 当前日期/月份字符串，每次刷新更新一次，传感器重置判断直接比较
+        now = datetime.now()
+        self._today_iso = now.date().isoformat()
+        self._month_iso = now.strftime("%Y-%m")
+        self._rebuild_index()
 
         super().__init__(
             hass,
             _LOGGER,
             name="Mindor Cloud",
             update_interval=timedelta(minutes=5),
+            # 数据未变化时跳过监听器回调，避免无意义的全量状态写入
+            always_update=False,
         )
 
+    def _signed_headers(self) -> dict:
+        """返回带签名的完整请求头，TTL窗口内复用避免重复签名计算
+
+        Timestamp为秒级且服务端允许一定偏差，TTL取远小于偏差的值，
+        轮询和命令突发共用同一份请求头dict。
+        """
+        now = monotonic()
+        cache = self._sig_cache
+        if cache is not None and now - cache[0] < _SIGN_TTL:
+            return cache[1]
+
+        opt = get_opt()
+        # 单次dict构建，避免中间headers副本和二次合并
+        merged_headers = {
+            "Content-Type": "application/json",
+            "Authorization": self.token,
+            "Sign": generate_sign(opt),
+            **{str(k): str(v) for k, v in opt.items()},
+        }
+        self._sig_cache = (now, merged_headers)
+        return merged_headers
+
+    def _rebuild_index(self):
+        """重建 id/device_id -> 设备 索引及每个设备的 act -> 状态项 索引
+
+        id 和 device_id 两种键都指向同一个设备dict（共享引用），
+        WebSocket消息按device_id查找、实体按id查找都是O(1)。
+        """
+        devices = self.devices or []
+        self._by_id = {}
+        for d in devices:
+            if d.get("id") is not None:
+                self._by_id[d["id"]] = d
+            if d.get("device_id"):
+                self._by_id[d["device_id"]] = d
+            d["_acts"] = {
+                item.get("act"): item
+                for item in d.get("device_act_status", [])
+            }
+
+        # 按typ_spu一次分桶，避免每个平台setup都全量扫描设备列表
+        buckets = {"socket": [], "socket_power": [], "climate": [], "cover": []}
+        for d in devices:
+            typ = d.get("typ_spu")
+            if typ in SOCKET_LIST:
+                buckets["socket"].append(d)
+            elif typ in SOCKET_POWER_LIST:
+                buckets["socket_power"].append(d)
+            elif typ in AIR_LIST:
+                buckets["climate"].append(d)
+            elif typ in CURTAIN_LIST:
+                buckets["cover"].append(d)
+        self._devices_by_platform = buckets
+
+    def _accumulate_energy(self, device: dict) -> None:
+        """用梯形法累计设备运行期用电量（kWh），传感器做差分读取
+
+        基于monotonic时钟，墙钟跳变不会产生异常增量。
+        """
+        item = (device.get("_acts") or {}).get("power")
+        if item is None:
+            return
+        try:
+            power = float(item.get("val"))
+        except (TypeError, ValueError):
+            return
+
+        now = monotonic()
+        device_id = device.get("id") or device.get("device_id")
+        prev = self._energy_acc.get(device_id)
+        if prev is None:
+            total = 0.0
+        else:
+            prev_power, prev_mono, total = prev
+            # 前后功率都为0时增量必为0，只推进时间戳，不做梯形计算
+            if prev_power == 0 and power == 0:
+                self._energy_acc[device_id] = (power, now, total)
+                return
+            # 平均功率(W) × 秒 / 3_600_000 = kWh
+            total += (prev_power + power) / 2 * (now - prev_mono) / 3_600_000
+        self._energy_acc[device_id] = (power, now, total)
+        device["_energy_total_kwh"] = total
+
     async def _on_ha_started(self, event):
         """Home Assistant启动时更新数据并建立WebSocket连接"""
         await self.async_request_refresh()
@@ -42,6 +233,10 @@ class MindorDataUpdateCoordinator(DataUpdateCoordinator):
                 user_id=self.user_id,
                 websocket_url=self.websocket_url,
                 on_message_callback=self._handle_websocket_message,
+                heartbeat=20,
+                receive_timeout=30,
+                max_queue=256,
+                session=self.session,
             )
 
             # 更新设备列表到WebSocket客户端
@@ -75,138 +270,77 @@ class MindorDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def _update_device_from_websocket(self, websocket_msg: dict):
         """从WebSocket消息更新设备数据"""
-        _LOGGER.warning(f"收到WebSocket消息: {websocket_msg}")
+        _LOGGER.debug("收到WebSocket消息: %s", websocket_msg)
         try:
             device_id = websocket_msg.get("device_id")
             if not device_id:
                 return
 
-            # 查找并更新设备数据
-            for i, device in enumerate(self.devices):
-                if (
-                    device.get("device_id") == device_id
-                    or device.get("id") == device_id
-                ):
-                    # 确保设备有device_act_status数组
-                    if "device_act_status" not in self.devices[i]:
-                        self.devices[i]["device_act_status"] = []
-
-                    act_status = self.devices[i]["device_act_status"]
-
-                    # 处理act_arr中的各种动作
-                    if websocket_msg.get("act_arr"):
-                        for act in websocket_msg["act_arr"]:
-                            act_type = act.get("act")
-                            act_val = act.get("val")
-
-                            if act_type == "source":
-                                # 插座开关状态
-                                is_on = act_val != "off"
-                                self.devices[i]["l1_state"] = is_on
-                                _LOGGER.info(
-                                    f"设备 {device_id} 开关状态更新为: {is_on}"
-                                )
-
-                            elif act_type == "power":
-                                # 电量款插座的实时功率
-                                power_value = (
-                                    float(act_val)
-                                    if act_val.replace(".", "").isdigit()
-                                    else 0.0
-                                )
-                                self._update_act_status(act_status, "power", act_val)
-                                _LOGGER.info(
-                                    f"插座 {device_id} 实时功率更新为: {power_value}W"
-                                )
-
-                            elif act_type == "thermoregulation":
-                                # 空调温度调节 - 更新device_act_status数组
-                                self._update_act_status(
-                                    act_status, "thermoregulation", act_val
-                                )
-                                _LOGGER.info(
-                                    f"空调 {device_id} 目标温度更新为: {act_val}°C"
-                                )
-
-                            elif act_type == "mode":
-                                # 空调模式切换 - 更新device_act_status数组
-                                self._update_act_status(act_status, "mode", act_val)
-                                mode_names = {
-                                    "01": "制冷",
-                                    "02": "制热",
-                                    "03": "除湿",
-                                    "04": "送风",
-                                    "05": "自动",
-                                }
-                                mode_name = mode_names.get(act_val, f"模式{act_val}")
-                                _LOGGER.info(
-                                    f"空调 {device_id} 模式更新为: {mode_name}"
-                                )
-
-                            elif act_type == "airSwing":
-                                # 空调摆风控制 - 更新device_act_status数组
-                                self._update_act_status(act_status, "airSwing", act_val)
-                                swing_names = {
-                                    "00": "关闭扫风",
-                                    "01": "上下扫风",
-                                    "02": "左右扫风",
-                                }
-                                swing_name = swing_names.get(act_val, f"摆风{act_val}")
-                                _LOGGER.info(
-                                    f"空调 {device_id} 摆风状态更新为: {swing_name}"
-                                )
-
-                            elif act_type == "windGear":
-                                # 空调风速控制 - 更新device_act_status数组
-                                self._update_act_status(act_status, "windGear", act_val)
-                                wind_names = {
-                                    "00": "自动",
-                                    "01": "低速",
-                                    "02": "中速",
-                                    "03": "高速",
-                                }
-                                wind_name = wind_names.get(act_val, f"风速{act_val}")
-                                _LOGGER.info(
-                                    f"空调 {device_id} 风速更新为: {wind_name}"
-                                )
-                            elif act_type == "On":
-                                # 空调开关状态
-                                self._update_act_status(act_status, "On", act_val)
-                                _LOGGER.info(
-                                    f"空调 {device_id} 开关状态更新为: {act_val}"
-                                )
-
-                    # 处理在线状态
-                    if websocket_msg.get("type") == "status":
-                        is_online = websocket_msg.get("data") == "online"
-                        self.devices[i]["online"] = is_online
-                        _LOGGER.info(f"设备 {device_id} 在线状态更新为: {is_online}")
-
-                    # 触发实体更新
-                    self.async_update_listeners()
-                    _LOGGER.debug(f"已更新设备 {device_id} 的实时数据")
-                    break
+            # 通过索引直接定位设备（dict为共享引用，self.devices同步更新）
+            device = self._by_id.get(device_id)
+            if device is None:
+                return
+
+            # 处理act_arr中的各种动作（分发表查找，见模块级 _ACT_DISPATCH）
+            if websocket_msg.get("act_arr"):
+                for act in websocket_msg["act_arr"]:
+                    handler = _ACT_DISPATCH.get(act.get("act"))
+                    if handler is not None:
+                        handler(self, device, device_id, act.get("val"))
+
+            # 处理在线状态
+            if websocket_msg.get("type") == "status":
+                is_online = websocket_msg.get("data") == "online"
+                device["online"] = is_online
+                _LOGGER.info("设备 %s 在线状态更新为: %s", device_id, is_online)
+
+            # 标记脏设备，同一事件循环tick内的消息只触发一次监听器派发
+            self._dirty_ids.add(device_id)
+            if self._flush_handle is None:
+                self._flush_handle = self.hass.loop.call_soon(
+                    self._flush_listeners
+                )
+            _LOGGER.debug("已更新设备 %s 的实时数据", device_id)
 
         except Exception as e:
             _LOGGER.error(f"从WebSocket更新设备数据时出错: {e}")
 
     def _update_act_status(
-        self, act_status: list, act_name: str, new_value: str
+        self, device: dict, act_name: str, new_value: str
     ) -> None:
-        """更新device_act_status数组中的指定状态值"""
-        # 查找并更新现有状态项
-        for item in act_status:
-            if item.get("act") == act_name:
-                item["val"] = new_value
-                _LOGGER.debug(f"已更新设备状态: {act_name} = {new_value}")
-                return
+        """更新设备device_act_status中的指定状态值，并保持act索引同步"""
+        acts = device.get("_acts")
+        if acts is None:
+            acts = device["_acts"] = {
+                item.get("act"): item
+                for item in device.get("device_act_status", [])
+            }
 
-        # 如果没找到对应项，则添加新项
-        act_status.append({"act": act_name, "val": new_value})
-        _LOGGER.debug(f"已添加设备状态: {act_name} = {new_value}")
+        # O(1)查找现有状态项（状态项dict在列表和索引间共享引用）
+        item = acts.get(act_name)
+        if item is not None:
+            item["val"] = new_value
+            _LOGGER.debug("已更新设备状态: %s = %s", act_name, new_value)
+            return
+
+        # 没找到对应项时添加新项，列表和act索引两个视图同时维护
+        new_item = {"act": act_name, "val": new_value}
+        device.setdefault("device_act_status", []).append(new_item)
+        acts[act_name] = new_item
+        _LOGGER.debug("已添加设备状态: %s = %s", act_name, new_value)
+
+    def _flush_listeners(self):
+        """派发合并后的实体更新（每个事件循环tick至多一次）"""
+        self._flush_handle = None
+        self._dirty_ids.clear()
+        self.update_id += 1
+        self.async_update_listeners()
 
     async def async_shutdown(self):
         """关闭coordinator时清理WebSocket连接"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
         if self.websocket_client:
             await self.websocket_client.disconnect()
             self.websocket_client = None
@@ -215,43 +349,37 @@ class MindorDataUpdateCoordinator(DataUpdateCoordinator):
     async def _async_update_data(self):
         """获取设备数据的更新方法"""
         try:
-            # 使用现有的API配置获取设备数据
-            request_config = RequestConfig()
-            opt = request_config.get_opt()
-            sign = request_config.generate_sign(opt)
-
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": self.token,
-                "Sign": sign,
-            }
-
-            opt_str = {str(k): str(v) for k, v in opt.items()}
-            merged_headers = {
-                **dict(headers),
-                **opt_str,
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{API_BASE}/md_openapi/home_assistant/devices",
-                    headers=merged_headers,
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        _LOGGER.warning(f"Devices: {data}")
-                        if data.get("errcode") != 0:
-                            _LOGGER.error(f"API返回错误: {data.get('msg')}")
-                            raise Exception(f"API错误: {data.get('msg', '未知错误')}")
-
-                        _LOGGER.debug(f"设备列表: {data}")
-                        # 更新设备列表
-                        self.devices = data["records"]
-                        _LOGGER.debug(f"成功更新 {len(self.devices)} 个设备的数据")
-                        return self.devices
-                    else:
-                        _LOGGER.error(f"HTTP请求失败: {response.status}")
-                        raise Exception(f"HTTP错误: {response.status}")
+            # 使用缓存的签名请求头获取设备数据
+            merged_headers = self._signed_headers()
+
+            # 复用共享会话，避免每次轮询重建TCP+TLS连接
+            async with self.session.get(
+                f"{API_BASE}/md_openapi/home_assistant/devices",
+                headers=merged_headers,
+            ) as response:
+                if response.status == 200:
+                    # orjson一次性解析原始字节，比response.json()的stdlib解析快
+                    data = orjson.loads(await response.read())
+                    _LOGGER.debug("Devices: %s", data)
+                    if data.get("errcode") != 0:
+                        _LOGGER.error(f"API返回错误: {data.get('msg')}")
+                        raise Exception(f"API错误: {data.get('msg', '未知错误')}")
+
+                    _LOGGER.debug("设备列表: %s", data)
+                    # 更新设备列表并重建索引，实体读取状态时哈希查找即可
+                    self.devices = data["records"]
+                    self._rebuild_index()
+                    for d in self.devices:
+                        self._accumulate_energy(d)
+                    now = datetime.now()
+                    self._today_iso = now.date().isoformat()
+                    self._month_iso = now.strftime("%Y-%m")
+                    self.update_id += 1
+                    _LOGGER.debug("成功更新 %s 个设备的数据", len(self.devices))
+                    return self.devices
+                else:
+                    _LOGGER.error(f"HTTP请求失败: {response.status}")
+                    raise Exception(f"HTTP错误: {response.status}")
 
         except Exception as e:
             _LOGGER.error(f"更新设备数据时出错: {e}")
@@ -6,10 +6,9 @@ from homeassistant.components.cover import (
 )
 from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
-from .const import DOMAIN, CURTAIN_LIST, API_BASE
-from .utils import debounce_command
-from .request_config import RequestConfig
-import aiohttp
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .const import DOMAIN, API_BASE
+from .utils import debounce_command, safe_int
 import logging
 
 _LOGGER = logging.getLogger(__name__)
@@ -18,30 +17,27 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass, entry, async_add_entities):
     """设置窗帘实体"""
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    devices = coordinator.devices
-    entities = []
-
-    for dev in devices:
-        device_type = dev.get("typ_spu")
-        if device_type in CURTAIN_LIST:
-            entities.append(MindorCurtainEntity(coordinator, dev))
-            _LOGGER.info(f"添加窗帘设备: {dev.get('name', '未知设备')} ({device_type})")
+    # 协调器刷新时已按平台分桶，直接取窗帘桶即可
+    devices = coordinator._devices_by_platform.get("cover", [])
+    entities = [MindorCurtainEntity(coordinator, dev) for dev in devices]
 
     if entities:
         async_add_entities(entities)
         _LOGGER.info(f"成功添加 {len(entities)} 个窗帘设备")
 
 
-class MindorCurtainEntity(CoverEntity):
+class MindorCurtainEntity(CoordinatorEntity, CoverEntity):
     """Mindor窗帘实体"""
 
     def __init__(self, coordinator, device_data):
         """初始化窗帘实体"""
-        self._coordinator = coordinator
+        super().__init__(coordinator)
         self._device_data = device_data
         self._device_id = device_data.get("device_id") or device_data.get("id")
         self._name = device_data.get("name", f"窗帘_{self._device_id}")
         self._unique_id = f"mindor_curtain_{self._device_id}"
+        # 命令后状态为乐观预估，由WebSocket回报做最终校准
+        self._attr_assumed_state = True
 
         # 窗帘状态
         self._current_position = 0  # 当前位置 (0-100)
@@ -56,17 +52,11 @@ class MindorCurtainEntity(CoverEntity):
     def _update_from_device_data(self):
         """从设备数据更新状态"""
         try:
-            act_status = self._device_data.get("device_act_status", [])
-
-            for status in act_status:
-                if status.get("act") == "curtain_percent":
-                    self._current_position = (
-                        int(status.get("val", 0))
-                        if str(status.get("val", 0)).isdigit()
-                        else 0
-                    )
-                    self._is_closed = self._current_position == 0
-                    break
+            # act索引由协调器维护，单次dict查找替代列表扫描
+            status = (self._device_data.get("_acts") or {}).get("curtain_percent")
+            if status is not None:
+                self._current_position = safe_int(status.get("val", 0))
+                self._is_closed = self._current_position == 0
             else:
                 # 如果没有找到curtain_percent，设置默认值
                 self._current_position = 0 if self._is_closed else 100
@@ -138,23 +128,19 @@ class MindorCurtainEntity(CoverEntity):
     def _update_local_device_status(self, act_type: str, value: str):
         """更新本地设备状态"""
         try:
-            # 确保device_act_status存在
-            if "device_act_status" not in self._device_data:
-                self._device_data["device_act_status"] = []
-
-            act_status = self._device_data["device_act_status"]
-
-            # 查找并更新现有状态项
-            for item in act_status:
-                if item.get("act") == act_type:
-                    item["val"] = value
-                    _LOGGER.debug(
-                        f"窗帘 {self._device_id} 本地状态更新: {act_type} = {value}"
-                    )
-                    return
-
-            # 如果没找到对应项，则添加新项
-            act_status.append({"act": act_type, "val": value})
+            acts = self._device_data.setdefault("_acts", {})
+            item = acts.get(act_type)
+            if item is not None:
+                item["val"] = value
+                _LOGGER.debug(
+                    f"窗帘 {self._device_id} 本地状态更新: {act_type} = {value}"
+                )
+                return
+
+            # 新增状态项时同时维护列表和索引两个视图
+            new_item = {"act": act_type, "val": value}
+            self._device_data.setdefault("device_act_status", []).append(new_item)
+            acts[act_type] = new_item
             _LOGGER.debug(f"窗帘 {self._device_id} 添加本地状态: {act_type} = {value}")
 
         except Exception as e:
@@ -172,9 +158,6 @@ class MindorCurtainEntity(CoverEntity):
 
         # 发送控制命令
         success = await self._send_command("percent", "100")
-        if not success:
-            self._is_opening = False
-            self.async_write_ha_state()
         if success:
             # 预估完全打开需要的时间，更新最终状态
             self._current_position = 100
@@ -190,9 +173,6 @@ class MindorCurtainEntity(CoverEntity):
 
         self.async_write_ha_state()
 
-        # 触发后台数据刷新
-        await self._coordinator.async_request_refresh()
-
     @debounce_command()
     async def async_close_cover(self, **kwargs):
         """关闭窗帘"""
@@ -201,13 +181,8 @@ class MindorCurtainEntity(CoverEntity):
         self._is_opening = False
         self.async_write_ha_state()
 
-        success = await self._send_command("percent", "0")
-        if not success:
-            self._is_closing = False
-            self.async_write_ha_state()
-
         # 发送控制命令
-        success = await self._send_command("percent", 0)
+        success = await self._send_command("percent", "0")
         if success:
             # 预估完全关闭需要的时间，更新最终状态
             self._current_position = 0
@@ -223,9 +198,6 @@ class MindorCurtainEntity(CoverEntity):
 
         self.async_write_ha_state()
 
-        # 触发后台数据刷新
-        await self._coordinator.async_request_refresh()
-
     @debounce_command()
     async def async_stop_cover(self, **kwargs):
         """停止窗帘"""
@@ -242,9 +214,6 @@ class MindorCurtainEntity(CoverEntity):
         if not success:
             _LOGGER.error(f"窗帘 {self._device_id} 停止命令发送失败")
 
-        # 触发后台数据刷新
-        await self._coordinator.async_request_refresh()
-
     @debounce_command()
     async def async_set_cover_position(self, **kwargs):
         """设置窗帘位置"""
@@ -286,55 +255,46 @@ class MindorCurtainEntity(CoverEntity):
 
         self.async_write_ha_state()
 
-        # 触发后台数据刷新
-        await self._coordinator.async_request_refresh()
 
     async def _send_command(self, act: str, val: str) -> bool:
         """发送窗帘控制命令"""
         try:
-            token = self._coordinator.token
+            # 防御性转换，调用方传入int也统一成字符串
+            val = str(val)
             device_id = self._device_id
 
             if not device_id:
                 _LOGGER.error("设备ID为空，无法发送命令")
                 return False
 
-            request_config = RequestConfig()
-            opt = request_config.get_opt()
-            sign = request_config.generate_sign(opt)
-
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": token,
-                "Sign": sign,
-                **{str(k): str(v) for k, v in opt.items()},
-            }
+            # 协调器缓存的签名请求头，命令突发时不重复计算签名
+            headers = self.coordinator._signed_headers()
 
             request_data = {"device_id": device_id, "act": act}
             if act != "stop":
                 request_data["val"] = val
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{API_BASE}/md_openapi/home_assistant/curtain_ctrl",
-                    json=request_data,
-                    headers=headers,
-                ) as resp:
-                    if resp.status != 200:
-                        _LOGGER.error(f"API请求失败，状态码: {resp.status}")
-                        return False
-
-                    response_data = await resp.json()
-                    success = response_data.get("errcode") == 0
-
-                    if success:
-                        _LOGGER.info(f"窗帘设备 {device_id} 命令 {act}={val} 执行成功")
-                    else:
-                        _LOGGER.error(
-                            f"窗帘设备控制失败: {response_data.get('msg', '未知错误')}"
-                        )
+            # 复用协调器的共享会话，命令走长连接而非每次新建会话
+            async with self.coordinator.session.post(
+                f"{API_BASE}/md_openapi/home_assistant/curtain_ctrl",
+                json=request_data,
+                headers=headers,
+            ) as resp:
+                if resp.status != 200:
+                    _LOGGER.error(f"API请求失败，状态码: {resp.status}")
+                    return False
+
+                response_data = await resp.json()
+                success = response_data.get("errcode") == 0
+
+                if success:
+                    _LOGGER.info(f"窗帘设备 {device_id} 命令 {act}={val} 执行成功")
+                else:
+                    _LOGGER.error(
+                        f"窗帘设备控制失败: {response_data.get('msg', '未知错误')}"
+                    )
 
-                    return success
+                return success
 
         except Exception as e:
             _LOGGER.error(f"发送窗帘命令失败: {e}")
@@ -343,27 +303,10 @@ class MindorCurtainEntity(CoverEntity):
     @callback
     def _handle_coordinator_update(self) -> None:
         """处理协调器更新"""
-        # 更新设备数据
-        for device in self._coordinator.devices:
-            if (
-                device.get("device_id") == self._device_id
-                or device.get("id") == self._device_id
-            ):
-                self._device_data = device
-                self._update_from_device_data()
-                break
+        # 通过协调器索引直接取本实体的设备数据，避免全量扫描
+        device = self.coordinator._by_id.get(self._device_id)
+        if device is not None:
+            self._device_data = device
+            self._update_from_device_data()
 
         self.async_write_ha_state()
-
-    async def async_added_to_hass(self) -> None:
-        """实体添加到Home Assistant时调用"""
-        await super().async_added_to_hass()
-        # 注册协调器更新回调
-        self.async_on_remove(
-            self._coordinator.async_add_listener(self._handle_coordinator_update)
-        )
-
-    async def async_update(self):
-        """更新实体状态"""
-        # 从协调器获取最新数据
-        await self._coordinator.async_request_refresh()
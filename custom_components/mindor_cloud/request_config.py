@@ -1,34 +1,70 @@
 import hashlib
+import secrets
 import time
-import random
-import string
-from urllib.parse import urlencode
+
+# 不变的请求参数，模块加载时构建一次，每次请求只需补充动态字段
+_BASE_OPT = {
+    "AppId": "q8mziWq3zcgQLUh8",
+    "Mode": "normal",
+    "key": "MjNTazzrYispfNu7yn",
+}
+
+
+def _fast_nonce(length=16):
+    """快速生成随机字符串（一次系统调用，比逐字符random.choices快）"""
+    return secrets.token_urlsafe(12)[:length]
+
+
+# 签名串中常量前缀的MD5状态预先吸收好，每次签名只需copy后追加动态部分
+_SIGN_PREFIX_MD5 = hashlib.md5(
+    f"AppId={_BASE_OPT['AppId']}&Mode={_BASE_OPT['Mode']}".encode("utf-8")
+)
+_SIGN_SUFFIX = f"&key={_BASE_OPT['key']}"
 
 
 class RequestConfig:
 
     def generate_random_string(self, length=16):
         """生成随机字符串"""
-        chars = string.ascii_letters + string.digits
-        return "".join(random.choices(chars, k=length))
+        return _fast_nonce(length)
 
     def get_opt(self):
-        """生成请求参数 opt"""
-        truncated_timestamp = int(time.time())
+        """生成请求参数 opt（签名依赖键的顺序，保持原有顺序不变）"""
         return {
-            "AppId": "q8mziWq3zcgQLUh8",
-            "Mode": "normal",
-            "NonceStr": self.generate_random_string(16),
-            "Timestamp": truncated_timestamp,
-            "key": "MjNTazzrYispfNu7yn",
+            "AppId": _BASE_OPT["AppId"],
+            "Mode": _BASE_OPT["Mode"],
+            "NonceStr": _fast_nonce(),
+            "Timestamp": int(time.time()),
+            "key": _BASE_OPT["key"],
         }
 
     def generate_sign(self, opt):
-        """生成签名 Sign"""
-        query_string = self.object_to_query_string(opt)
-        md5_hash = hashlib.md5(query_string.encode("utf-8")).hexdigest()
-        return md5_hash
+        """生成签名 Sign（复用常量前缀的MD5状态，只吸收动态字段）"""
+        md5_hash = _SIGN_PREFIX_MD5.copy()
+        md5_hash.update(
+            f"&NonceStr={opt['NonceStr']}"
+            f"&Timestamp={opt['Timestamp']}{_SIGN_SUFFIX}".encode("utf-8")
+        )
+        return md5_hash.hexdigest()
 
     def object_to_query_string(self, obj):
-        """将字典转换为 URL 查询字符串"""
-        return urlencode(obj)
+        """将 opt 字典转换为 URL 查询字符串（键固定且值均为安全字符，直接拼接）"""
+        return (
+            f"AppId={obj['AppId']}&Mode={obj['Mode']}"
+            f"&NonceStr={obj['NonceStr']}&Timestamp={obj['Timestamp']}"
+            f"&key={obj['key']}"
+        )
+
+
+# 模块级单例与便捷函数，调用方不必每次命令都实例化RequestConfig
+_REQUEST_CONFIG = RequestConfig()
+
+
+def get_opt():
+    """生成请求参数 opt"""
+    return _REQUEST_CONFIG.get_opt()
+
+
+def generate_sign(opt):
+    """生成签名 Sign"""
+    return _REQUEST_CONFIG.generate_sign(opt)
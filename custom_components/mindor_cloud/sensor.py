@@ -8,7 +8,7 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
@@ -18,7 +18,7 @@ from homeassistant.const import (
     UnitOfEnergy,
 )
 
-from .const import DOMAIN, SOCKET_POWER_LIST
+from .const import DOMAIN
 from .coordinator import MindorDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -27,6 +27,28 @@ _LOGGER = logging.getLogger(__name__)
 ENERGY_STORAGE_VERSION = 1
 ENERGY_STORAGE_KEY = "mindor_energy_data"
 
+# 延迟落盘秒数：今日/本月两个传感器的增量合并为至多每分钟一次写文件
+ENERGY_SAVE_DELAY = 60
+
+# 小于该值的增量不触发落盘调度，设备待机时不空转写文件
+ENERGY_SAVE_THRESHOLD = 1e-6
+
+# 设备级共享的Store与数据dict，两个用电量传感器写同一份数据
+_ENERGY_STORES: Dict[str, Store] = {}
+_ENERGY_DATA: Dict[str, Dict[str, Any]] = {}
+
+
+def _energy_store(hass: HomeAssistant, device_id: str) -> Store:
+    """获取设备共享的能耗Store（每设备一个文件，按需创建）"""
+    store = _ENERGY_STORES.get(device_id)
+    if store is None:
+        store = _ENERGY_STORES[device_id] = Store(
+            hass,
+            ENERGY_STORAGE_VERSION,
+            f"{ENERGY_STORAGE_KEY}_{device_id}",
+        )
+    return store
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -36,28 +58,16 @@ async def async_setup_entry(
     """设置传感器实体"""
     coordinator: MindorDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    # 获取设备列表
-    devices = coordinator.data if isinstance(coordinator.data, list) else []
-    _LOGGER.debug(f"获取到 {len(devices)} 个设备用于传感器设置")
-
+    # 协调器刷新时已按平台分桶，直接取电量插座桶
     entities = []
-
-    for device in devices:
-        device_type = device.get("typ_spu", "")
-        if device_type in SOCKET_POWER_LIST:
-            _LOGGER.debug(f"为电量插座创建传感器: {device.get('name')}")
-
-            # 创建功率传感器
-            entities.append(MindorPowerSensor(coordinator, device))
-
-            # 创建今日用电量传感器
-            entities.append(MindorTodayEnergySensor(coordinator, device))
-
-            # 创建本月用电量传感器
-            entities.append(MindorMonthEnergySensor(coordinator, device))
+    for device in coordinator._devices_by_platform.get("socket_power", []):
+        # 功率 / 今日用电量 / 本月用电量 三个传感器
+        entities.append(MindorPowerSensor(coordinator, device))
+        entities.append(MindorTodayEnergySensor(coordinator, device))
+        entities.append(MindorMonthEnergySensor(coordinator, device))
 
     if entities:
-        async_add_entities(entities, True)
+        async_add_entities(entities)
         _LOGGER.info(f"成功添加 {len(entities)} 个传感器实体")
     else:
         _LOGGER.warning("未找到支持的电量插座设备")
@@ -73,11 +83,11 @@ class MindorPowerSensorBase(CoordinatorEntity, SensorEntity):
         self._device = device
         self._device_id = device.get("id", "unknown")
         self._device_name = device.get("name", "Unknown Socket")
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """返回设备信息"""
-        return DeviceInfo(
+        # 功率解析结果按协调器数据代次缓存，同一次更新内多次读取不重复解析
+        self._cached_update_id = -1
+        self._cached_power: Optional[float] = None
+        # 设备标识不会变化，DeviceInfo构建一次供注册表反复读取
+        self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, f"socket_power_{self._device_id}")},
             name=f"{self._device_name} (电量版)",
             manufacturer="Mindor",
@@ -88,24 +98,36 @@ class MindorPowerSensorBase(CoordinatorEntity, SensorEntity):
     @property
     def available(self) -> bool:
         """返回传感器可用性"""
-        if not self.coordinator.data:
+        device = self.coordinator._by_id.get(self._device_id)
+        if device is None:
             return False
-
-        # 检查设备是否在线
-        for device in self.coordinator.data:
-            if device.get("id") == self._device_id:
-                return device.get("online", False)
-        return False
+        return device.get("online", False)
 
     def _get_current_device_data(self) -> Optional[Dict[str, Any]]:
-        """获取当前设备的最新数据"""
-        if not self.coordinator.data:
-            return None
+        """获取当前设备的最新数据（协调器索引O(1)查找）"""
+        return self.coordinator._by_id.get(self._device_id)
 
-        for device in self.coordinator.data:
-            if device.get("id") == self._device_id:
-                return device
-        return None
+    def _extract_current_power(self) -> Optional[float]:
+        """提取当前功率值，同一协调器数据代次内只解析一次"""
+        if self._cached_update_id == self.coordinator.update_id:
+            return self._cached_power
+
+        power = None
+        device_data = self._get_current_device_data()
+        if device_data:
+            # act索引由协调器维护，单次dict查找替代列表扫描
+            status_item = (device_data.get("_acts") or {}).get("power")
+            if status_item is not None:
+                power_val = status_item.get("val")
+                if power_val is not None:
+                    try:
+                        power = float(power_val)
+                    except (ValueError, TypeError):
+                        pass
+
+        self._cached_update_id = self.coordinator.update_id
+        self._cached_power = power
+        return power
 
 
 class MindorPowerSensor(MindorPowerSensorBase):
@@ -121,129 +143,130 @@ class MindorPowerSensor(MindorPowerSensorBase):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_native_unit_of_measurement = UnitOfPower.WATT
         self._attr_icon = "mdi:flash"
+        # 初始值按当前协调器数据解析一次
+        self._attr_native_value = self._extract_current_power()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """协调器推送时解析一次功率，属性读取直接返回缓存值"""
+        self._attr_native_value = self._extract_current_power()
+        super()._handle_coordinator_update()
 
-    @property
-    def native_value(self) -> Optional[float]:
-        """返回功率值"""
-        device_data = self._get_current_device_data()
-        if device_data:
-            # 从device_act_status数组中查找power值
-            device_act_status = device_data.get("device_act_status", [])
-            if device_act_status:
-                for status_item in device_act_status:
-                    if (
-                        isinstance(status_item, dict)
-                        and status_item.get("act") == "power"
-                    ):
-                        power_val = status_item.get("val")
-                        if power_val is not None:
-                            try:
-                                return float(power_val)
-                            except (ValueError, TypeError):
-                                pass
-        return None
-
-
-class MindorTodayEnergySensor(MindorPowerSensorBase):
-    """今日用电量传感器 - 基于实时功率计算"""
+
+class MindorEnergySensorBase(MindorPowerSensorBase):
+    """用电量传感器基类：设备级共享Store + 延迟合并落盘"""
 
     def __init__(
         self, coordinator: MindorDataUpdateCoordinator, device: Dict[str, Any]
     ):
         super().__init__(coordinator, device)
-        self._attr_name = f"{self._device_name} 今日用电量"
-        self._attr_unique_id = f"mindor_energy_today_{self._device_id}"
-        self._attr_device_class = SensorDeviceClass.ENERGY
-        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
-        self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-        self._attr_icon = "mdi:counter"
-
-        # 初始化存储（拆分为独立的today键）
-        self._store = Store(
-            coordinator.hass,
-            ENERGY_STORAGE_VERSION,
-            f"{ENERGY_STORAGE_KEY}_today_{self._device_id}",
-        )
+        self._store = _energy_store(coordinator.hass, self._device_id)
         self._energy_data = None
-        self._last_power = None
-        self._last_update_time = None
+        # 上次已计入本传感器的协调器累计能耗值
+        self._applied_energy_total = None
+        # 缓存的对外展示值，仅在增量或重置时重算round
+        self._rounded_value: Optional[float] = None
 
-        # 加载历史数据
-        coordinator.hass.async_create_task(self._load_energy_data())
+    async def async_added_to_hass(self) -> None:
+        """实体添加后再加载历史数据，不在setup阶段挤占executor"""
+        await super().async_added_to_hass()
+        await self._load_energy_data()
 
     async def _load_energy_data(self):
-        """加载历史用电量数据"""
+        """加载历史用电量数据（同设备只加载一次，两个传感器共享）"""
         try:
-            data = await self._store.async_load()
-            if data:
-                self._energy_data = data
-                _LOGGER.debug(f"加载设备 {self._device_id} 的今日用电量数据: {data}")
-            else:
-                # 兼容旧版合并存储，尝试从旧键读取
-                legacy_store = Store(
-                    self.coordinator.hass,
-                    ENERGY_STORAGE_VERSION,
-                    f"{ENERGY_STORAGE_KEY}_{self._device_id}",
-                )
-                legacy = await legacy_store.async_load()
-                if legacy:
-                    self._energy_data = {
-                        "today_energy": float(legacy.get("today_energy", 0.0)),
-                        "last_reset_date": legacy.get(
-                            "last_reset_date", datetime.now().date().isoformat()
-                        ),
-                    }
-                    _LOGGER.info(
-                        f"从旧存储迁移今日用电量: {self._device_id} -> {self._energy_data}"
-                    )
-                else:
-                    self._energy_data = {
-                        "today_energy": 0.0,
-                        "last_reset_date": datetime.now().date().isoformat(),
-                    }
-        except Exception as e:
-            _LOGGER.error(f"加载今日用电量数据失败: {e}")
-            self._energy_data = {
-                "today_energy": 0.0,
-                "last_reset_date": datetime.now().date().isoformat(),
-            }
-
-    async def _save_energy_data(self):
-        """保存用电量数据"""
-        try:
-            await self._store.async_save(self._energy_data)
+            shared = _ENERGY_DATA.get(self._device_id)
+            if shared is None:
+                shared = await self._store.async_load() or {}
+
+                # 兼容旧版拆分存储：合并键缺字段时从today/month键补齐
+                if "today_energy" not in shared or "month_energy" not in shared:
+                    for suffix in ("today", "month"):
+                        legacy_store = Store(
+                            self.coordinator.hass,
+                            ENERGY_STORAGE_VERSION,
+                            f"{ENERGY_STORAGE_KEY}_{suffix}_{self._device_id}",
+                        )
+                        legacy = await legacy_store.async_load()
+                        if legacy:
+                            for key, value in legacy.items():
+                                shared.setdefault(key, value)
+                            _LOGGER.info(
+                                f"从拆分存储迁移用电量: {self._device_id} ({suffix})"
+                            )
+
+                now = datetime.now()
+                shared.setdefault("today_energy", 0.0)
+                shared.setdefault("last_reset_date", now.date().isoformat())
+                shared.setdefault("month_energy", 0.0)
+                shared.setdefault("last_reset_month", now.strftime("%Y-%m"))
+                # 并发加载时先完成者生效，保证两个传感器引用同一dict
+                shared = _ENERGY_DATA.setdefault(self._device_id, shared)
+
+            self._energy_data = shared
         except Exception as e:
-            _LOGGER.error(f"保存用电量数据失败: {e}")
-
-    def _calculate_energy_increment(self, current_power: float) -> float:
-        """计算用电量增量"""
-        if self._last_power is None or self._last_update_time is None:
-            self._last_power = current_power
-            self._last_update_time = datetime.now()
+            _LOGGER.error(f"加载用电量数据失败: {e}")
+            now = datetime.now()
+            self._energy_data = _ENERGY_DATA.setdefault(
+                self._device_id,
+                {
+                    "today_energy": 0.0,
+                    "last_reset_date": now.date().isoformat(),
+                    "month_energy": 0.0,
+                    "last_reset_month": now.strftime("%Y-%m"),
+                },
+            )
+
+    def _schedule_save(self):
+        """延迟合并落盘，窗口内的多次增量只产生一次写文件"""
+        self._store.async_delay_save(lambda: self._energy_data, ENERGY_SAVE_DELAY)
+
+    def _pending_energy_increment(self) -> float:
+        """读取协调器累计能耗相对上次应用点的增量（kWh）
+
+        增量由协调器基于monotonic时钟统一计算，今日/本月传感器
+        各自记录已应用到哪个累计值，避免重复计入。
+        """
+        device_data = self._get_current_device_data()
+        if device_data is None:
+            return 0.0
+        total = device_data.get("_energy_total_kwh")
+        if total is None:
             return 0.0
 
-        current_time = datetime.now()
-        time_diff_hours = (current_time - self._last_update_time).total_seconds() / 3600
+        last = self._applied_energy_total
+        self._applied_energy_total = total
+        if last is None:
+            return 0.0
+        return total - last
 
-        # 使用平均功率计算用电量：(上次功率 + 当前功率) / 2 * 时间间隔
-        avg_power = (self._last_power + current_power) / 2
-        energy_increment = avg_power * time_diff_hours / 1000  # 转换为kWh
 
-        self._last_power = current_power
-        self._last_update_time = current_time
+class MindorTodayEnergySensor(MindorEnergySensorBase):
+    """今日用电量传感器 - 基于实时功率计算"""
 
-        return energy_increment
+    def __init__(
+        self, coordinator: MindorDataUpdateCoordinator, device: Dict[str, Any]
+    ):
+        super().__init__(coordinator, device)
+        self._attr_name = f"{self._device_name} 今日用电量"
+        self._attr_unique_id = f"mindor_energy_today_{self._device_id}"
+        self._attr_device_class = SensorDeviceClass.ENERGY
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+        self._attr_icon = "mdi:counter"
 
     def _check_and_reset_daily(self):
         """检查并重置日用电量"""
         if not self._energy_data:
             return
 
-        current_date = datetime.now().date().isoformat()
+        # 协调器每次刷新缓存好日期字符串，这里只做比较
+        current_date = self.coordinator._today_iso
         if self._energy_data.get("last_reset_date") != current_date:
             _LOGGER.info(f"设备 {self._device_id} 重置今日用电量")
             self._energy_data["today_energy"] = 0.0
             self._energy_data["last_reset_date"] = current_date
+            self._rounded_value = 0.0
 
     @property
     def native_value(self) -> Optional[float]:
@@ -254,37 +277,26 @@ class MindorTodayEnergySensor(MindorPowerSensorBase):
         # 检查是否需要重置
         self._check_and_reset_daily()
 
-        # 获取当前功率
-        device_data = self._get_current_device_data()
-        if device_data:
-            device_act_status = device_data.get("device_act_status", [])
-            current_power = None
-
-            for status_item in device_act_status:
-                if isinstance(status_item, dict) and status_item.get("act") == "power":
-                    power_val = status_item.get("val")
-                    if power_val is not None:
-                        try:
-                            current_power = float(power_val)
-                            break
-                        except (ValueError, TypeError):
-                            pass
-
-            if current_power is not None:
-                # 计算用电量增量
-                energy_increment = self._calculate_energy_increment(current_power)
-                if energy_increment > 0:
-                    self._energy_data["today_energy"] += energy_increment
-                    # 异步保存数据
-                    self.hass.async_create_task(self._save_energy_data())
-                    _LOGGER.debug(
-                        f"设备 {self._device_id} 今日用电量增加 {energy_increment:.6f} kWh，总计 {self._energy_data['today_energy']:.3f} kWh"
-                    )
-
-        return round(self._energy_data.get("today_energy", 0.0), 3)
-
-
-class MindorMonthEnergySensor(MindorPowerSensorBase):
+        # 应用协调器统一计算的用电量增量
+        energy_increment = self._pending_energy_increment()
+        if energy_increment > 0:
+            # 增量无论大小都要入账，阈值只决定是否调度落盘
+            self._energy_data["today_energy"] += energy_increment
+            self._rounded_value = round(self._energy_data["today_energy"], 3)
+            if energy_increment > ENERGY_SAVE_THRESHOLD:
+                # 延迟合并落盘
+                self._schedule_save()
+                _LOGGER.debug(
+                    f"设备 {self._device_id} 今日用电量增加 {energy_increment:.6f} kWh，总计 {self._energy_data['today_energy']:.3f} kWh"
+                )
+
+        # round只在增量或重置时重算，常规读取直接返回缓存值
+        if self._rounded_value is None:
+            self._rounded_value = round(self._energy_data.get("today_energy", 0.0), 3)
+        return self._rounded_value
+
+
+class MindorMonthEnergySensor(MindorEnergySensorBase):
     """本月用电量传感器 - 基于实时功率计算"""
 
     def __init__(
@@ -298,91 +310,18 @@ class MindorMonthEnergySensor(MindorPowerSensorBase):
         self._attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
         self._attr_icon = "mdi:calendar-month"
 
-        # 初始化存储（拆分为独立的month键）
-        self._store = Store(
-            coordinator.hass,
-            ENERGY_STORAGE_VERSION,
-            f"{ENERGY_STORAGE_KEY}_month_{self._device_id}",
-        )
-        self._energy_data = None
-        self._last_power = None
-        self._last_update_time = None
-
-        # 加载历史数据
-        coordinator.hass.async_create_task(self._load_energy_data())
-
-    async def _load_energy_data(self):
-        """加载历史用电量数据"""
-        try:
-            data = await self._store.async_load()
-            if data:
-                self._energy_data = data
-            else:
-                # 兼容旧版合并存储，尝试从旧键读取
-                legacy_store = Store(
-                    self.coordinator.hass,
-                    ENERGY_STORAGE_VERSION,
-                    f"{ENERGY_STORAGE_KEY}_{self._device_id}",
-                )
-                legacy = await legacy_store.async_load()
-                if legacy:
-                    self._energy_data = {
-                        "month_energy": float(legacy.get("month_energy", 0.0)),
-                        "last_reset_month": legacy.get(
-                            "last_reset_month", datetime.now().strftime("%Y-%m")
-                        ),
-                    }
-                    _LOGGER.info(
-                        f"从旧存储迁移本月用电量: {self._device_id} -> {self._energy_data}"
-                    )
-                else:
-                    self._energy_data = {
-                        "month_energy": 0.0,
-                        "last_reset_month": datetime.now().strftime("%Y-%m"),
-                    }
-        except Exception as e:
-            _LOGGER.error(f"加载本月用电量数据失败: {e}")
-            self._energy_data = {
-                "month_energy": 0.0,
-                "last_reset_month": datetime.now().strftime("%Y-%m"),
-            }
-
-    async def _save_energy_data(self):
-        """保存用电量数据"""
-        try:
-            await self._store.async_save(self._energy_data)
-        except Exception as e:
-            _LOGGER.error(f"保存用电量数据失败: {e}")
-
-    def _calculate_energy_increment(self, current_power: float) -> float:
-        """计算用电量增量"""
-        if self._last_power is None or self._last_update_time is None:
-            self._last_power = current_power
-            self._last_update_time = datetime.now()
-            return 0.0
-
-        current_time = datetime.now()
-        time_diff_hours = (current_time - self._last_update_time).total_seconds() / 3600
-
-        # 使用平均功率计算用电量
-        avg_power = (self._last_power + current_power) / 2
-        energy_increment = avg_power * time_diff_hours / 1000  # 转换为kWh
-
-        self._last_power = current_power
-        self._last_update_time = current_time
-
-        return energy_increment
-
     def _check_and_reset_monthly(self):
         """检查并重置月用电量"""
         if not self._energy_data:
             return
 
-        current_month = datetime.now().strftime("%Y-%m")
+        # 协调器每次刷新缓存好月份字符串，这里只做比较
+        current_month = self.coordinator._month_iso
         if self._energy_data.get("last_reset_month") != current_month:
             _LOGGER.info(f"设备 {self._device_id} 重置本月用电量")
             self._energy_data["month_energy"] = 0.0
             self._energy_data["last_reset_month"] = current_month
+            self._rounded_value = 0.0
 
     @property
     def native_value(self) -> Optional[float]:
@@ -393,31 +332,20 @@ class MindorMonthEnergySensor(MindorPowerSensorBase):
         # 检查是否需要重置
         self._check_and_reset_monthly()
 
-        # 获取当前功率
-        device_data = self._get_current_device_data()
-        if device_data:
-            device_act_status = device_data.get("device_act_status", [])
-            current_power = None
-
-            for status_item in device_act_status:
-                if isinstance(status_item, dict) and status_item.get("act") == "power":
-                    power_val = status_item.get("val")
-                    if power_val is not None:
-                        try:
-                            current_power = float(power_val)
-                            break
-                        except (ValueError, TypeError):
-                            pass
-
-            if current_power is not None:
-                # 计算用电量增量
-                energy_increment = self._calculate_energy_increment(current_power)
-                if energy_increment > 0:
-                    self._energy_data["month_energy"] += energy_increment
-                    # 异步保存数据
-                    self.hass.async_create_task(self._save_energy_data())
-                    _LOGGER.debug(
-                        f"设备 {self._device_id} 本月用电量增加 {energy_increment:.6f} kWh，总计 {self._energy_data['month_energy']:.3f} kWh"
-                    )
-
-        return round(self._energy_data.get("month_energy", 0.0), 3)
+        # 应用协调器统一计算的用电量增量
+        energy_increment = self._pending_energy_increment()
+        if energy_increment > 0:
+            # 增量无论大小都要入账，阈值只决定是否调度落盘
+            self._energy_data["month_energy"] += energy_increment
+            self._rounded_value = round(self._energy_data["month_energy"], 3)
+            if energy_increment > ENERGY_SAVE_THRESHOLD:
+                # 延迟合并落盘
+                self._schedule_save()
+                _LOGGER.debug(
+                    f"设备 {self._device_id} 本月用电量增加 {energy_increment:.6f} kWh，总计 {self._energy_data['month_energy']:.3f} kWh"
+                )
+
+        # round只在增量或重置时重算，常规读取直接返回缓存值
+        if self._rounded_value is None:
+            self._rounded_value = round(self._energy_data.get("month_energy", 0.0), 3)
+        return self._rounded_value
@@ -1,19 +1,20 @@
 import logging
 from typing import Any, Dict, List, Optional
 import aiohttp
+import orjson
 import time
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 
-from .const import DOMAIN, SOCKET_LIST, SOCKET_POWER_LIST, API_BASE
+from .const import DOMAIN, API_BASE
 from .coordinator import MindorDataUpdateCoordinator
 from .utils import debounce_command, get_global_debouncer
-from .request_config import RequestConfig
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,27 +27,15 @@ async def async_setup_entry(
     """设置开关实体"""
     coordinator: MindorDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    # 获取设备列表
-    devices = coordinator.data if isinstance(coordinator.data, list) else []
-    _LOGGER.debug(f"获取到 {len(devices)} 个设备")
+    # 协调器刷新时已按平台分桶，直接取两类插座桶，无需逐设备判型
+    sockets = coordinator._devices_by_platform.get("socket", [])
+    power_sockets = coordinator._devices_by_platform.get("socket_power", [])
 
-    entities = []
-
-    for device in devices:
-        device_type = device.get("typ_spu", "")
-        _LOGGER.debug(
-            f"处理设备: {device.get('name', 'Unknown')} (类型: {device_type})"
-        )
-
-        if device_type in SOCKET_LIST:
-            _LOGGER.debug(f"创建普通插座实体: {device.get('name')}")
-            entities.append(MindorSocketEntity(coordinator, device))
-        elif device_type in SOCKET_POWER_LIST:
-            _LOGGER.debug(f"创建电量插座实体: {device.get('name')}")
-            entities.append(MindorSocketPowerEntity(coordinator, device))
+    entities: List = [MindorSocketEntity(coordinator, d) for d in sockets]
+    entities += [MindorSocketPowerEntity(coordinator, d) for d in power_sockets]
 
     if entities:
-        async_add_entities(entities, True)
+        async_add_entities(entities)
         _LOGGER.info(f"成功添加 {len(entities)} 个开关实体")
     else:
         _LOGGER.warning("未找到支持的插座设备")
@@ -60,65 +49,62 @@ class MindorSocketEntity(CoordinatorEntity, SwitchEntity):
     ):
         super().__init__(coordinator)
         self._device = device
+        self._device_id = device.get("id", "unknown")
         self._attr_name = device.get("name", "Unknown Socket")
-        self._attr_unique_id = f"mindor_socket_{device.get('id', 'unknown')}"
+        self._attr_unique_id = f"mindor_socket_{self._device_id}"
 
         # 获取全局防抖器
         self._debouncer = get_global_debouncer()
+        # 最近一次命令的monotonic时刻，None表示尚未发过命令
+        self._last_command_time: Optional[float] = None
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """返回设备信息"""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"socket_{self._device.get('id', 'unknown')}")},
-            name=self._device.get("name", "Unknown Device"),
+        # 设备标识不会变化，DeviceInfo构建一次供注册表反复读取
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"socket_{self._device_id}")},
+            name=device.get("name", "Unknown Device"),
             manufacturer="Mindor",
-            model=self._device.get("typ_spu", "Unknown Model"),
-            sw_version=self._device.get("firmware_ver", "1.0"),
+            model=device.get("typ_spu", "Unknown Model"),
+            sw_version=device.get("firmware_ver", "1.0"),
         )
 
-    @property
-    def is_on(self) -> bool:
-        """返回开关状态"""
+        # 初始状态按当前协调器数据计算一次
+        self._refresh_from_coordinator()
+
+    def _refresh_from_coordinator(self) -> None:
+        """从协调器数据计算一次开关状态与可用性
+
+        推送模型：每次协调器更新只计算一次并写入_attr_*，
+        属性读取不再做索引查找。
+        """
+        device = self.coordinator._by_id.get(self._device_id)
+        # 严格根据设备自身的在线状态决定可用性
+        self._attr_available = device.get("online", False) if device else False
+
         # 如果刚执行过命令（30秒内），优先使用本地状态
-        if hasattr(self, '_last_command_time'):
-            if time.time() - self._last_command_time < 30:
-                return self._device.get("l1_state", False)
-        
-        # 否则从coordinator获取最新设备状态
-        devices = (
-            self.coordinator.data if isinstance(self.coordinator.data, list) else []
-        )
-        for device in devices:
-            if device.get("id") == self._device.get("id"):
-                return device.get("l1_state")
-        return False
+        if (
+            self._last_command_time is not None
+            and time.monotonic() - self._last_command_time < 30
+        ):
+            self._attr_is_on = self._device.get("l1_state", False)
+        elif device is not None:
+            self._attr_is_on = device.get("l1_state", False)
+        else:
+            self._attr_is_on = self._device.get("l1_state", False)
 
     @property
     def available(self) -> bool:
-        """返回设备可用性"""
-        # 从coordinator获取最新设备状态
-        devices = (
-            self.coordinator.data if isinstance(self.coordinator.data, list) else []
-        )
+        """返回设备可用性
 
-        # 获取当前设备状态
-        current_device_online = False
-        for device in devices:
-            if device.get("id") == self._device.get("id"):
-                current_device_online = device.get("online", False)
-                break
+        CoordinatorEntity的available只看最近一次轮询是否成功，会忽略
+        _attr_available，这里显式叠加按设备计算的在线状态。
+        """
+        return super().available and self._attr_available
 
-        # 严格根据设备自身的在线状态决定可用性
-        is_available = current_device_online
-
-        _LOGGER.debug(
-            f"设备 {self._attr_name} 可用性检查: "
-            f"自身在线={current_device_online}, "
-            f"最终可用={is_available}"
-        )
-
-        return is_available
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """处理协调器更新：计算一次状态后写入HA"""
+        self._refresh_from_coordinator()
+        self.async_write_ha_state()
 
     @debounce_command(interval=1.0)
     async def async_turn_on(self, **kwargs: Any) -> None:
@@ -133,8 +119,10 @@ class MindorSocketEntity(CoordinatorEntity, SwitchEntity):
 
         if success:
             _LOGGER.info(f"插座 {self._attr_name} 已成功打开")
-            # 触发协调器更新以获取最新状态
-            await self.coordinator.async_request_refresh()
+            # 本地状态已在命令回包时写好，通知监听者即可，无需整表刷新
+            self.coordinator.async_update_listeners()
+            # 5秒后做一次校验刷新，与云端状态对齐
+            async_call_later(self.hass, 5, self._verify_state)
         else:
             _LOGGER.error(f"插座 {self._attr_name} 打开失败")
 
@@ -151,11 +139,17 @@ class MindorSocketEntity(CoordinatorEntity, SwitchEntity):
 
         if success:
             _LOGGER.info(f"插座 {self._attr_name} 已成功关闭")
-            # 触发协调器更新以获取最新状态
-            await self.coordinator.async_request_refresh()
+            # 本地状态已在命令回包时写好，通知监听者即可，无需整表刷新
+            self.coordinator.async_update_listeners()
+            # 5秒后做一次校验刷新，与云端状态对齐
+            async_call_later(self.hass, 5, self._verify_state)
         else:
             _LOGGER.error(f"插座 {self._attr_name} 关闭失败")
 
+    async def _verify_state(self, _now) -> None:
+        """命令后的延迟校验刷新"""
+        await self.coordinator.async_request_refresh()
+
     async def _send_command(self, command: str) -> bool:
         """发送控制命令"""
         try:
@@ -170,24 +164,8 @@ class MindorSocketEntity(CoordinatorEntity, SwitchEntity):
                 _LOGGER.error("设备device_id为空")
                 return False
 
-            # 创建请求配置
-            req = RequestConfig()
-            opt = req.get_opt()
-            sign = req.generate_sign(opt)
-
-            # 构建请求头
-            headers = {
-                "Authorization": token,
-                "Sign": sign,
-                "Content-Type": "application/json",
-            }
-
-            # 添加 opt 参数到请求头
-            opt_str = {str(k): str(v) for k, v in opt.items()}
-            merged_headers = {
-                **dict(headers),
-                **opt_str,
-            }
+            # 协调器缓存的签名请求头，命令突发时不重复计算签名
+            merged_headers = self.coordinator._signed_headers()
 
             # 构建请求数据
             request_data = {
@@ -195,48 +173,48 @@ class MindorSocketEntity(CoordinatorEntity, SwitchEntity):
                 "act": command,
             }
 
-            _LOGGER.debug(f"发送命令 {command} 到设备 {device_id}")
-
-            # 发送 API 请求
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{API_BASE}/md_openapi/home_assistant/ctrl",
-                    json=request_data,
-                    headers=merged_headers,
-                ) as resp:
-                    if resp.status != 200:
-                        _LOGGER.error(f"API请求失败，状态码: {resp.status}")
-                        return False
-
-                    response_data = await resp.json()
-                    _LOGGER.debug(f"API响应: {response_data}")
-
-                    # 检查响应结果
-                    if response_data.get("errcode") == 0:
-                        _LOGGER.info(f"设备 {device_id} 命令 {command} 执行成功")
-
-                        # 立即更新本地设备状态
-                        new_state = command == "on"
-                        self._device["l1_state"] = new_state
-
-                        if hasattr(self.coordinator, "data") and self.coordinator.data:
-                            for device in self.coordinator.data:
-                                if device.get("id") == self._device.get("id"):
-                                    device["l1_state"] = new_state
-                                    break
-
-                        # 设置一个标志，防止协调器立即更新覆盖状态
-                        self._last_command_time = time.time()
-
-                        # 立即更新HA状态
-                        self.async_write_ha_state()
-
-                        _LOGGER.info(f"设备 {device_id} 命令 {command} 执行成功")
-                        return True
-                    else:
-                        error_msg = response_data.get("msg", "未知错误")
-                        _LOGGER.error(f"设备控制失败: {error_msg}")
-                        return False
+            _LOGGER.debug("发送命令 %s 到设备 %s", command, device_id)
+
+            # 发送 API 请求（复用协调器的共享会话，保持长连接）
+            async with self.coordinator.session.post(
+                f"{API_BASE}/md_openapi/home_assistant/ctrl",
+                json=request_data,
+                headers=merged_headers,
+                timeout=aiohttp.ClientTimeout(total=10),
+            ) as resp:
+                if resp.status != 200:
+                    _LOGGER.error(f"API请求失败，状态码: {resp.status}")
+                    return False
+
+                response_data = orjson.loads(await resp.read())
+                _LOGGER.debug("API响应: %s", response_data)
+
+                # 检查响应结果
+                if response_data.get("errcode") == 0:
+                    _LOGGER.info(f"设备 {device_id} 命令 {command} 执行成功")
+
+                    # 立即更新本地设备状态
+                    new_state = command == "on"
+                    self._device["l1_state"] = new_state
+                    self._attr_is_on = new_state
+
+                    # 实体持有的dict可能是旧代次数据，索引中的当前设备同步一份
+                    device = self.coordinator._by_id.get(self._device_id)
+                    if device is not None and device is not self._device:
+                        device["l1_state"] = new_state
+
+                    # 设置一个标志，防止协调器立即更新覆盖状态
+                    self._last_command_time = time.monotonic()
+
+                    # 立即更新HA状态
+                    self.async_write_ha_state()
+
+                    _LOGGER.info(f"设备 {device_id} 命令 {command} 执行成功")
+                    return True
+                else:
+                    error_msg = response_data.get("msg", "未知错误")
+                    _LOGGER.error(f"设备控制失败: {error_msg}")
+                    return False
 
         except aiohttp.ClientError as e:
             _LOGGER.error(f"网络请求错误: {e}")
@@ -259,44 +237,31 @@ class MindorSocketEntity(CoordinatorEntity, SwitchEntity):
                 _LOGGER.error("设备ID为空")
                 return {}
 
-            # 创建请求配置
-            req = RequestConfig()
-            opt = req.get_opt()
-            sign = req.generate_sign(opt)
+            # 协调器缓存的签名请求头，命令突发时不重复计算签名
+            headers = self.coordinator._signed_headers()
 
-            # 构建请求头
-            headers = {
-                "Authorization": token,
-                "Sign": sign,
-            }
+            _LOGGER.debug("获取设备 %s 状态", device_id)
+
+            # 发送 API 请求（复用协调器的共享会话，保持长连接）
+            async with self.coordinator.session.get(
+                f"{API_BASE}/md_openapi/home_assistant/device/status?device_id={device_id}",
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=10),
+            ) as resp:
+                if resp.status != 200:
+                    _LOGGER.error(f"获取设备状态失败，状态码: {resp.status}")
+                    return {}
 
-            # 添加 opt 参数到请求头
-            opt_str = {str(k): str(v) for k, v in opt.items()}
-            headers.update(opt_str)
-
-            _LOGGER.debug(f"获取设备 {device_id} 状态")
-
-            # 发送 API 请求
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{API_BASE}/md_openapi/home_assistant/device/status?device_id={device_id}",
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=10),
-                ) as resp:
-                    if resp.status != 200:
-                        _LOGGER.error(f"获取设备状态失败，状态码: {resp.status}")
-                        return {}
-
-                    response_data = await resp.json()
-                    _LOGGER.debug(f"设备状态响应: {response_data}")
-
-                    # 检查响应结果
-                    if response_data.get("errcode") == 0:
-                        return response_data.get("data", {})
-                    else:
-                        error_msg = response_data.get("msg", "未知错误")
-                        _LOGGER.error(f"获取设备状态失败: {error_msg}")
-                        return {}
+                response_data = orjson.loads(await resp.read())
+                _LOGGER.debug("设备状态响应: %s", response_data)
+
+                # 检查响应结果
+                if response_data.get("errcode") == 0:
+                    return response_data.get("data", {})
+                else:
+                    error_msg = response_data.get("msg", "未知错误")
+                    _LOGGER.error(f"获取设备状态失败: {error_msg}")
+                    return {}
 
         except aiohttp.ClientError as e:
             _LOGGER.error(f"网络请求错误: {e}")
@@ -314,108 +279,39 @@ class MindorSocketPowerEntity(MindorSocketEntity):
     ):
         super().__init__(coordinator, device)
         self._attr_name = f"{device.get('name', 'Unknown Socket')} (电量)"
-        self._attr_unique_id = f"mindor_socket_power_{device.get('id', 'unknown')}"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """返回设备信息"""
-        return DeviceInfo(
-            identifiers={(DOMAIN, f"socket_power_{self._device.get('id', 'unknown')}")},
-            name=f"{self._device.get('name', 'Unknown Device')} (电量版)",
+        self._attr_unique_id = f"mindor_socket_power_{self._device_id}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"socket_power_{self._device_id}")},
+            name=f"{device.get('name', 'Unknown Device')} (电量版)",
             manufacturer="Mindor",
-            model=f"{self._device.get('typ_spu', 'Unknown Model')} (Power)",
-            sw_version=self._device.get("firmware_ver", "1.0"),
-        )
-
-    @property
-    def is_on(self) -> bool:
-        """返回设备是否开启"""
-        # 如果刚执行过命令（30秒内），优先使用本地状态
-        if hasattr(self, "_last_command_time"):
-            if time.time() - self._last_command_time < 30:
-                return self._device.get("l1_state", False)
-
-        # 否则从协调器数据获取最新状态
-        if self.coordinator.data:
-            for device in self.coordinator.data:
-                if device.get("id") == self._device.get("id"):
-                    return device.get("l1_state", False)
-        return self._device.get("l1_state", False)
-
-    @property
-    def available(self) -> bool:
-        """电量插座的可用性检查"""
-        # 从coordinator获取最新设备状态
-        devices = (
-            self.coordinator.data if isinstance(self.coordinator.data, list) else []
+            model=f"{device.get('typ_spu', 'Unknown Model')} (Power)",
+            sw_version=device.get("firmware_ver", "1.0"),
         )
 
-        # 检查是否有任何电量插座在线
-        any_power_socket_online = False
-        for device in devices:
-            if device.get("typ_spu") in SOCKET_POWER_LIST and device.get("online"):
-                any_power_socket_online = True
-                break
-        # 获取当前设备状态
-        current_device_online = False
-        for device in devices:
-            if device.get("id") == self._device.get("id"):
-                current_device_online = device.get("online", False)
-                break
-
-        # 如果有电量插座在线，所有设备都可用；否则检查自身状态
-        is_available = any_power_socket_online or current_device_online
-
-        _LOGGER.debug(
-            f"电量插座 {self._attr_name} 可用性检查: "
-            f"任意电量插座在线={any_power_socket_online}, "
-            f"自身在线={current_device_online}, "
-            f"最终可用={is_available}"
-        )
-
-        return is_available
+    def _refresh_from_coordinator(self) -> None:
+        """电量插座：自身离线时任一电量插座在线也视为可用"""
+        super()._refresh_from_coordinator()
+        if not self._attr_available:
+            power_sockets = self.coordinator._devices_by_platform.get(
+                "socket_power", []
+            )
+            self._attr_available = any(d.get("online") for d in power_sockets)
 
     @property
     def extra_state_attributes(self) -> Dict[str, Any]:
         """返回额外的状态属性"""
-        # 从coordinator获取最新设备状态
-        devices = (
-            self.coordinator.data if isinstance(self.coordinator.data, list) else []
-        )
-        current_device = None
-
-        for device in devices:
-            if device.get("id") == self._device.get("id"):
-                current_device = device
-                break
+        # 通过协调器索引获取最新设备状态
+        current_device = self.coordinator._by_id.get(self._device_id) or self._device
 
-        if not current_device:
-            current_device = self._device
+        # 只扫描电量插座桶，检查是否有任何电量插座在线
+        power_sockets = self.coordinator._devices_by_platform.get("socket_power", [])
+        any_power_socket_online = any(d.get("online") for d in power_sockets)
 
-        # 检查是否有任何电量插座在线
-        any_power_socket_online = False
-        for device in devices:
-            if device.get("typ_spu") in SOCKET_POWER_LIST and device.get("online"):
-                any_power_socket_online = True
-                break
+        # act索引由协调器维护，单次dict查找取当前功率
+        power_item = (current_device.get("_acts") or {}).get("power")
 
-    async def async_update(self) -> None:
-        """更新设备状态"""
-        try:
-            # 触发coordinator更新
-            await self.coordinator.async_request_refresh()
-
-            # 从coordinator获取最新设备信息
-            devices = (
-                self.coordinator.data if isinstance(self.coordinator.data, list) else []
-            )
-            for device in devices:
-                if device.get("id") == self._device.get("id"):
-                    # 更新设备信息
-                    self._device.update(device)
-                    break
-
-            _LOGGER.debug(f"电量插座 {self._attr_name} 状态已更新")
-
-        except Exception as e:
-            _LOGGER.error(f"更新电量插座 {self._attr_name} 状态失败: {e}")
+        return {
+            "online": current_device.get("online", False),
+            "power": power_item.get("val") if power_item else None,
+            "any_power_socket_online": any_power_socket_online,
+        }
@@ -7,71 +7,113 @@ import logging
 _LOGGER = logging.getLogger(__name__)
 
 
+def safe_int(value, default: int = 0) -> int:
+    """安全转换为int，失败返回默认值（不产生临时str做预判）"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def safe_float(value, default: float = 0.0) -> float:
+    """安全转换为float，失败返回默认值"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class _Entry:
+    """单个实体的防抖状态（上次命令时刻 + 是否处理中）"""
+
+    __slots__ = ("last", "busy")
+
+    def __init__(self):
+        self.last = 0.0
+        self.busy = False
+
+
 class CommandDebouncer:
     """命令防抖器类，防止频繁调用API"""
 
-    def __init__(self, interval: float = 0.3):
+    def __init__(self, interval: float = 0.15):
         """初始化防抖器
 
         Args:
             interval: 防抖间隔时间（秒）
         """
         self.interval = interval
-        self._last_command_time: Dict[str, float] = {}
-        self._is_processing: Dict[str, bool] = {}
+        # 每个key一个_Entry，单次哈希查找取到全部状态
+        self._entries: Dict[str, _Entry] = {}
 
-    def can_execute_command(self, entity_id: str) -> bool:
+    def can_execute_command(self, entity_id: str, now: float = None) -> bool:
         """检查是否可以执行命令
 
         Args:
             entity_id: 实体ID，用于区分不同的实体
+            now: 调用方预取的monotonic时刻；缺省时自行读取
 
         Returns:
             bool: 是否可以执行命令
         """
-        current_time = time.time()
-        last_time = self._last_command_time.get(entity_id, 0)
-        is_processing = self._is_processing.get(entity_id, False)
+        entry = self._entries.get(entity_id)
+        if entry is None:
+            return True
 
         # 如果正在处理中，拒绝执行
-        if is_processing:
-            _LOGGER.debug(f"Entity {entity_id}: 命令正在处理中，跳过")
+        if entry.busy:
+            _LOGGER.debug("Entity %s: 命令正在处理中，跳过", entity_id)
             return False
 
-        # 检查时间间隔
-        if current_time - last_time < self.interval:
+        # 检查时间间隔（monotonic时钟，不受墙钟跳变影响）
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - entry.last
+        if elapsed < self.interval:
             _LOGGER.debug(
-                f"Entity {entity_id}: 防抖限制，距离上次命令仅 {current_time - last_time:.2f}s"
+                "Entity %s: 防抖限制，距离上次命令仅 %.2fs", entity_id, elapsed
             )
             return False
 
         return True
 
-    def mark_command_start(self, entity_id: str):
+    def _entry(self, entity_id: str) -> _Entry:
+        """取出或创建实体的防抖状态"""
+        entry = self._entries.get(entity_id)
+        if entry is None:
+            entry = self._entries[entity_id] = _Entry()
+        return entry
+
+    def mark_command_start(self, entity_id: str, now: float = None):
         """标记命令开始执行"""
-        self._last_command_time[entity_id] = time.time()
-        self._is_processing[entity_id] = True
-        _LOGGER.debug(f"Entity {entity_id}: 命令开始执行")
+        entry = self._entry(entity_id)
+        entry.last = time.monotonic() if now is None else now
+        entry.busy = True
+        _LOGGER.debug("Entity %s: 命令开始执行", entity_id)
 
     def mark_command_end(self, entity_id: str):
         """标记命令执行结束"""
-        self._is_processing[entity_id] = False
-        _LOGGER.debug(f"Entity {entity_id}: 命令执行结束")
+        entry = self._entries.get(entity_id)
+        if entry is not None:
+            entry.busy = False
+        _LOGGER.debug("Entity %s: 命令执行结束", entity_id)
 
     def reset_entity(self, entity_id: str):
         """重置实体的防抖状态"""
-        self._last_command_time.pop(entity_id, None)
-        self._is_processing.pop(entity_id, None)
-        _LOGGER.debug(f"Entity {entity_id}: 防抖状态已重置")
+        self._entries.pop(entity_id, None)
+        _LOGGER.debug("Entity %s: 防抖状态已重置", entity_id)
 
 
 # 全局防抖器实例
 _global_debouncer = CommandDebouncer()
 
 
-def debounce_command(interval: float = 1.0, use_global: bool = True):
+def debounce_command(interval: float = 0.15, use_global: bool = True):
     """防抖装饰器
 
+    按"实体+方法"分键，不同命令（如风速和温度）互不阻塞；窗口内的重复调用
+    后写覆盖前写，只在窗口结束时用最新参数补发一次，中间值直接丢弃。
+
     Args:
         interval: 防抖间隔时间（秒）
         use_global: 是否使用全局防抖器
@@ -79,29 +121,49 @@ def debounce_command(interval: float = 1.0, use_global: bool = True):
 
     def decorator(func: Callable) -> Callable:
         debouncer = _global_debouncer if use_global else CommandDebouncer(interval)
+        # 窗口内被合并的最新调用参数与补发定时器，按key存放
+        pending: Dict[str, tuple] = {}
+        trailing: Dict[str, Any] = {}
 
         @wraps(func)
         async def wrapper(self, *args, **kwargs):
             entity_id = getattr(self, "entity_id", str(id(self)))
+            key = f"{entity_id}:{func.__name__}"
+
+            # 事件循环缓存的monotonic时刻，整个调用只取一次时间
+            now = asyncio.get_running_loop().time()
 
             # 检查是否可以执行
-            if not debouncer.can_execute_command(entity_id):
-                _LOGGER.warning(f"Entity {entity_id}: 命令被防抖限制，请稍后再试")
+            if not debouncer.can_execute_command(key, now):
+                # 后写覆盖前写：只保留最新参数，窗口结束时补发一次
+                pending[key] = (self, args, kwargs)
+                if key not in trailing:
+                    loop = asyncio.get_running_loop()
+
+                    def _fire(key=key):
+                        trailing.pop(key, None)
+                        latest = pending.pop(key, None)
+                        if latest is not None:
+                            obj, a, kw = latest
+                            asyncio.ensure_future(wrapper(obj, *a, **kw))
+
+                    trailing[key] = loop.call_later(debouncer.interval, _fire)
+                _LOGGER.debug("Entity %s: 命令被防抖合并，仅保留最新值", key)
                 return
 
             # 标记开始执行
-            debouncer.mark_command_start(entity_id)
+            debouncer.mark_command_start(key, now)
 
             try:
                 # 执行原函数
                 result = await func(self, *args, **kwargs)
                 return result
             except Exception as e:
-                _LOGGER.error(f"Entity {entity_id}: 命令执行失败: {e}")
+                _LOGGER.error(f"Entity {key}: 命令执行失败: {e}")
                 raise
             finally:
                 # 标记执行结束
-                debouncer.mark_command_end(entity_id)
+                debouncer.mark_command_end(key)
 
         return wrapper
 
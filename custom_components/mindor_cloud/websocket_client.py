@@ -1,6 +1,12 @@
 import asyncio
-import json
 import logging
+import random
+import socket
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+
+import orjson
 from typing import Callable, Optional, Dict, Any, List
 import aiohttp
 from aiohttp import WSMsgType
@@ -9,6 +15,36 @@ from .request_config import RequestConfig
 
 _LOGGER = logging.getLogger(__name__)
 
+# 心跳帧的特征串，入队前就地识别，避免为ping做JSON解析
+_PING_MARKER = b'"type":"ping"'
+_PING_MARKER_STR = '"type":"ping"'
+
+
+@dataclass(slots=True)
+class DeviceState:
+    """单设备热路径状态：每帧只读写这三个字段，与完整元数据分离"""
+
+    is_on: bool = False
+    online: bool = False
+    is_operation: bool = False
+
+
+class _State(IntEnum):
+    """连接状态机：单一状态替代多个语义重叠的布尔标志"""
+
+    IDLE = 0
+    CONNECTING = 1
+    OPEN = 2
+    RECONNECTING = 3
+    CLOSED = 4
+
+
+def _is_ping(raw) -> bool:
+    """判断原始帧是否为心跳：type字段位于帧首，只看前缀即可"""
+    if isinstance(raw, bytes):
+        return _PING_MARKER in raw[:24]
+    return _PING_MARKER_STR in raw[:24]
+
 
 class MindorWebSocketClient:
     """Mindor云服务WebSocket客户端 - 完全基于JavaScript实现"""
@@ -19,38 +55,54 @@ class MindorWebSocketClient:
         user_id: str,
         websocket_url: str,
         on_message_callback: Optional[Callable] = None,
+        heartbeat: float = 20,
+        receive_timeout: float = 30,
+        max_queue: int = 256,
+        session: Optional[aiohttp.ClientSession] = None,
     ):
         self.token = token
         self.user_id = user_id
         self.websocket_url = websocket_url
         self.on_message_callback = on_message_callback
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.heartbeat = heartbeat
+        self.receive_timeout = receive_timeout
+        # 注入的共享会话不归本客户端管理，disconnect时不关闭
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self.websocket: Optional[aiohttp.ClientWebSocketResponse] = None
 
         # 连接状态管理
-        self.is_connected = False
-        self.is_close = False
-        self.is_connected_websocket = False
-        self.is_reconnect = False
+        self._state = _State.IDLE
         self.connect_count = 0
         self.max_connect_attempts = 30
 
-        # 定时器
-        self.reconnect_timer = None
-        self.connect_timer = None
+        # 定时器（loop.call_later句柄，轻量于专门起Task睡眠）
+        self.connect_timer: Optional[asyncio.TimerHandle] = None
 
         # 监听任务
         self._listen_task: Optional[asyncio.Task] = None
 
+        # 读取端与处理端之间的有界队列，消息突发时丢弃最旧而非无限堆积
+        self._msg_queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._consume_task: Optional[asyncio.Task] = None
+
         # 设备数据缓存
         self.equipment_list = []
         self.handle_info = {}
+        # device_id -> 热路径状态对象，完整元数据仍留在equipment_list
+        self._states: Dict[str, DeviceState] = {}
+        # device_id -> 预拼接的"{device_id}_status"键，省去每帧f-string
+        self._status_key: Dict[str, str] = {}
+        # 状态键 -> 已排期的合并回调定时器，同键窗口内只挂一个
+        self._status_timers: Dict[str, asyncio.TimerHandle] = {}
 
     async def init_websocket(self) -> bool:
         """初始化WebSocket连接 - 基于JavaScript的initWebsocket方法"""
         try:
+            self._state = _State.CONNECTING
             if self.session is None:
                 self.session = aiohttp.ClientSession()
+                self._owns_session = True
 
             # 构建请求头
             headers = {
@@ -58,20 +110,30 @@ class MindorWebSocketClient:
                 "Authorization": self.token,
             }
 
-            _LOGGER.info(f"正在连接WebSocket: {self.websocket_url}")
+            _LOGGER.info("正在连接WebSocket: %s", self.websocket_url)
 
             self.websocket = await self.session.ws_connect(
                 self.websocket_url,
                 headers=headers,
-                heartbeat=30,
+                heartbeat=self.heartbeat,
+                receive_timeout=self.receive_timeout,
                 timeout=aiohttp.ClientTimeout(total=10),
+                # 短JSON帧场景下per-message deflate纯耗CPU，关闭压缩；
+                # 放宽单帧上限，避免大设备列表帧被拒
+                compress=0,
+                max_msg_size=4 * 1024 * 1024,
             )
 
+            # 显式禁用Nagle并开启QUICKACK，降低小帧往返延迟
+            self._tune_socket()
+
             # 连接成功处理
             await self._on_websocket_open()
 
-            # 启动消息监听
+            # 启动消息监听与队列消费
             self._listen_task = asyncio.create_task(self._listen_messages())
+            if self._consume_task is None or self._consume_task.done():
+                self._consume_task = asyncio.create_task(self._consume_messages())
 
             return True
 
@@ -80,29 +142,40 @@ class MindorWebSocketClient:
             await self._on_websocket_error(e)
             return False
 
+    def _tune_socket(self):
+        """在底层socket上设置TCP_NODELAY/TCP_QUICKACK
+
+        asyncio通常默认开启TCP_NODELAY，这里显式设置以兼容不同
+        Python/系统版本；TCP_QUICKACK仅Linux可用，失败时静默跳过。
+        """
+        try:
+            sock = self.websocket.get_extra_info("socket")
+            if sock is None:
+                return
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if hasattr(socket, "TCP_QUICKACK"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        except OSError as e:
+            _LOGGER.debug("设置TCP选项失败: %s", e)
+
+        try:
+            # 调高写缓冲水位，减少小帧发送时的drain暂停。
+            # aiohttp未公开暴露transport，只能经writer内部属性取到
+            self.websocket._writer.transport.set_write_buffer_limits(
+                high=256 * 1024, low=64 * 1024
+            )
+        except (AttributeError, RuntimeError) as e:
+            _LOGGER.debug("设置写缓冲水位失败: %s", e)
+
     async def _on_websocket_open(self):
         """WebSocket连接打开事件处理"""
         _LOGGER.info("WebSocket已经打开")
-        self.is_close = True
-        self.is_connected_websocket = True
-        self.is_connected = True
+        self._state = _State.OPEN
         self.connect_count = 0
 
-        # 延迟1秒处理重连状态
-        if self.reconnect_timer:
-            self.reconnect_timer.cancel()
-
-        self.reconnect_timer = asyncio.create_task(self._delayed_reconnect_reset())
-
         # 订阅整个设备列表
         await self._subscribe_device_list()
 
-    async def _delayed_reconnect_reset(self):
-        """延迟重置重连状态"""
-        await asyncio.sleep(1)
-        _LOGGER.debug("延迟1秒再处理isReconnect状态")
-        self.is_reconnect = False
-
     async def _subscribe_device_list(self):
         """订阅设备列表频道"""
         try:
@@ -113,12 +186,13 @@ class MindorWebSocketClient:
 
             subscribe_message = {
                 "command": "subscribe",
-                "identifier": json.dumps(subscribe_info),
+                "identifier": orjson.dumps(subscribe_info).decode(),
             }
 
-            _LOGGER.info(f"订阅整个列表信息: {subscribe_message}")
+            _LOGGER.info("订阅整个列表信息: %s", subscribe_message)
 
-            await self.websocket.send_str(json.dumps(subscribe_message))
+            # orjson直接产出bytes，send_bytes省去一次str→bytes编码
+            await self.websocket.send_bytes(orjson.dumps(subscribe_message))
             _LOGGER.info("订阅整个列表结果: 已发送")
 
         except Exception as e:
@@ -128,34 +202,41 @@ class MindorWebSocketClient:
         """WebSocket错误事件处理"""
         _LOGGER.error(f"WebSocket错误: {error}")
 
+        if self._state == _State.CLOSED:
+            return
+
+        self._state = _State.RECONNECTING
         if self.connect_count > self.max_connect_attempts:
-            _LOGGER.error(f"重新连接{self.max_connect_attempts}次，退出")
+            _LOGGER.error("重新连接%s次，退出", self.max_connect_attempts)
             return
 
         self.connect_count += 1
 
-        # 3秒后重新连接
+        # 指数退避+抖动：服务端抖动时不再以固定节奏反复冲击
+        delay = min(60.0, 1.0 * (2 ** min(self.connect_count, 6)))
+        delay *= 0.8 + random.random() * 0.4
+
         if self.connect_timer:
             self.connect_timer.cancel()
 
-        self.connect_timer = asyncio.create_task(self._delayed_reconnect())
+        loop = asyncio.get_running_loop()
+        self.connect_timer = loop.call_later(delay, self._schedule_reconnect)
+        _LOGGER.info("%.1f秒后重新连接websocket", delay)
 
-    async def _delayed_reconnect(self):
-        """延迟重连"""
-        await asyncio.sleep(3)
-        _LOGGER.info("3秒后重新连接websocket")
-        await self.connect_websocket()
+    def _schedule_reconnect(self):
+        """定时器到期后发起重连"""
+        asyncio.create_task(self.connect_websocket())
 
     async def _on_websocket_close(self, close_info=None):
         """WebSocket关闭事件处理"""
-        _LOGGER.info(f"WebSocket连接已关闭: {close_info}")
-        self.is_connected = False
+        _LOGGER.info("WebSocket连接已关闭: %s", close_info)
 
-        if self.is_reconnect:
+        if self._state == _State.CLOSED:
             _LOGGER.info("主动断开不需要重新连接")
             return
 
-        if self.is_close:
+        if self._state == _State.OPEN:
+            self._state = _State.RECONNECTING
             if self.connect_timer:
                 self.connect_timer.cancel()
 
@@ -164,147 +245,165 @@ class MindorWebSocketClient:
 
     async def _on_websocket_message(self, message_data):
         """WebSocket消息事件处理"""
+        # 只有解析本身需要异常保护；处理逻辑异常由消费循环兜底
         try:
-            result = json.loads(message_data)
-            websocket_msg = result.get("message")
+            result = orjson.loads(message_data)
+        except orjson.JSONDecodeError as e:
+            _LOGGER.error("解析WebSocket消息失败: %s", e)
+            return
 
-            # 忽略ping消息，处理其他消息
-            if result.get("type") != "ping" and isinstance(websocket_msg, dict):
-                await self._process_device_message(websocket_msg)
+        if not isinstance(result, dict):
+            return
 
-            # 调用外部回调
-            if self.on_message_callback:
-                await self.on_message_callback(result)
+        websocket_msg = result.get("message")
 
-        except json.JSONDecodeError as e:
-            _LOGGER.error(f"解析WebSocket消息失败: {e}")
-        except Exception as e:
-            _LOGGER.error(f"处理WebSocket消息异常: {e}")
+        # 忽略ping消息，处理其他消息
+        if result.get("type") != "ping" and isinstance(websocket_msg, dict):
+            await self._process_device_message(websocket_msg)
+
+        # 调用外部回调
+        if self.on_message_callback:
+            await self.on_message_callback(result)
 
     async def _process_device_message(self, websocket_msg: dict):
         """处理设备消息"""
-        try:
-            device_id = websocket_msg.get("device_id")
-            if not device_id:
-                return
-
-            # 查找设备在列表中的索引
-            find_idx = -1
-            for i, item in enumerate(self.equipment_list):
-                if item.get("device_id") == device_id:
-                    find_idx = i
-                    break
-
-            if find_idx == -1:
-                return
+        device_id = websocket_msg.get("device_id")
+        if not device_id:
+            return
 
-            # 处理动作数组
-            if websocket_msg.get("act_arr"):
-                await self._process_device_actions(websocket_msg, find_idx)
+        # O(1)取出设备的热路径状态，未知设备直接忽略
+        state = self._states.get(device_id)
+        if state is None:
+            return
 
-            # 处理设备状态（在线/离线）
-            if websocket_msg.get("type") == "status":
-                await self._process_device_status(websocket_msg, find_idx)
+        # 处理动作数组
+        if websocket_msg.get("act_arr"):
+            await self._process_device_actions(websocket_msg, state)
 
-        except Exception as e:
-            _LOGGER.error(f"处理设备消息异常: {e}")
+        # 处理设备状态（在线/离线）
+        if websocket_msg.get("type") == "status":
+            await self._process_device_status(websocket_msg, state)
 
-    async def _process_device_actions(self, websocket_msg: dict, find_idx: int):
+    async def _process_device_actions(self, websocket_msg: dict, state: DeviceState):
         """处理设备动作"""
-        try:
-            device_id = websocket_msg.get("device_id")
-            act_arr = websocket_msg.get("act_arr", [])
-
-            for item in act_arr:
-                if item.get("act") == "source":
-                    # 清除设备操作状态
-                    if find_idx < len(self.equipment_list):
-                        self.equipment_list[find_idx]["isOperation"] = False
+        device_id = websocket_msg.get("device_id")
+        act_arr = websocket_msg.get("act_arr", [])
+
+        # 单次反向扫描取最后一条source，多条时后者覆盖前者，只回调一次
+        source_item = next(
+            (it for it in reversed(act_arr) if it.get("act") == "source"), None
+        )
+        if source_item is None:
+            return
 
-                    # 处理定时回调
-                    await self._handle_timer_callback(
-                        device_id, item, find_idx, callback_type="switch"
-                    )
+        # 清除设备操作状态（state已在上游校验过非None）
+        state.is_operation = False
 
-        except Exception as e:
-            _LOGGER.error(f"处理设备动作异常: {e}")
+        # 同步执行回调，零延迟路径不再经过协程调度
+        self._apply_callback(device_id, source_item, state, "switch")
 
-    async def _process_device_status(self, websocket_msg: dict, find_idx: int):
+    async def _process_device_status(self, websocket_msg: dict, state: DeviceState):
         """处理设备状态"""
-        try:
-            device_id = websocket_msg.get("device_id")
-            device_type_id = f"{device_id}_status"
+        device_id = websocket_msg.get("device_id")
+        # 状态键在update_equipment_list时已预拼接，未知设备走+拼接兜底
+        device_type_id = self._status_key.get(device_id) or (device_id + "_status")
 
-            # 初始化处理信息
-            if device_type_id not in self.handle_info:
-                self.handle_info[device_type_id] = []
+        # 初始化处理信息（有界环形缓冲，防止积压泄漏）
+        if device_type_id not in self.handle_info:
+            self.handle_info[device_type_id] = deque(maxlen=64)
 
-            self.handle_info[device_type_id].append(websocket_msg)
+        self.handle_info[device_type_id].append(websocket_msg)
 
-            # 清除设备操作状态
-            if find_idx < len(self.equipment_list):
-                self.equipment_list[find_idx]["isOperation"] = False
+        # 清除设备操作状态（state已在上游校验过非None）
+        state.is_operation = False
 
-            # 处理状态回调
-            await self._handle_timer_callback(
+        # 状态回调延迟1秒合并处理；已有待触发定时器时不重复排期，
+        # 避免多个回调共享同一缓冲，先到者清空后其余误判离线
+        if device_type_id not in self._status_timers:
+            self._status_timers[device_type_id] = asyncio.get_running_loop().call_later(
+                1.0,
+                self._apply_callback,
                 device_type_id,
                 self.handle_info[device_type_id],
-                find_idx,
-                callback_type="status",
-                delay=1,
+                state,
+                "status",
             )
 
-        except Exception as e:
-            _LOGGER.error(f"处理设备状态异常: {e}")
-
-    async def _handle_timer_callback(
-        self, key: str, item: Any, find_idx: int, callback_type: str, delay: int = 0
+    def _apply_callback(
+        self, key: str, item: Any, state: DeviceState, callback_type: str
     ):
-        """处理定时回调"""
+        """应用回调结果（同步方法，延迟路径由loop.call_later调度）"""
+        # call_later调度的调用没有消费循环兜底，只窄捕获畸形payload
         try:
-            if delay > 0:
-                await asyncio.sleep(delay)
-
             if callback_type == "switch":
                 # 处理开关状态
                 switch_val = item.get("val", "off")
                 is_on = switch_val != "off"
 
-                if find_idx < len(self.equipment_list):
-                    self.equipment_list[find_idx]["isOn"] = is_on
+                state.is_on = is_on
 
-                # 清除处理信息
+                # 清除处理信息（clear复用原列表，不新建空list）
                 device_id = key
-                if device_id in self.handle_info:
-                    self.handle_info[device_id] = []
+                lst = self.handle_info.get(device_id)
+                if lst is not None:
+                    lst.clear()
 
-                _LOGGER.info(f"设备 {device_id} 开关状态更新为: {is_on}")
+                _LOGGER.info("设备 %s 开关状态更新为: %s", device_id, is_on)
 
             elif callback_type == "status":
-                # 处理在线状态
-                status_list = item if isinstance(item, list) else [item]
+                self._status_timers.pop(key, None)
+
+                # 处理在线状态；缓冲为空说明本窗口无新帧，不改写在线状态
+                status_list = item if isinstance(item, (list, deque)) else [item]
+                if not status_list:
+                    return
                 is_online = any(
                     status_item.get("data") == "online" for status_item in status_list
                 )
 
-                if find_idx < len(self.equipment_list):
-                    self.equipment_list[find_idx]["online"] = is_online
+                state.online = is_online
 
-                # 清除处理信息
-                if key in self.handle_info:
-                    self.handle_info[key] = []
+                # 清除处理信息（clear复用原列表，不新建空list）
+                lst = self.handle_info.get(key)
+                if lst is not None:
+                    lst.clear()
 
-                _LOGGER.info(f"设备状态更新 - 在线状态: {is_online}")
+                _LOGGER.info("设备状态更新 - 在线状态: %s", is_online)
 
-        except Exception as e:
-            _LOGGER.error(f"处理定时回调异常: {e}")
+        except (AttributeError, KeyError, TypeError) as e:
+            _LOGGER.error("应用回调结果异常: %s", e)
+
+    def _enqueue_message(self, raw):
+        """消息入队；队列满时丢弃最旧一条，读取端不被处理端反压阻塞"""
+        try:
+            self._msg_queue.put_nowait(raw)
+        except asyncio.QueueFull:
+            try:
+                self._msg_queue.get_nowait()
+                _LOGGER.warning("WebSocket消息队列已满，丢弃最旧消息")
+            except asyncio.QueueEmpty:
+                pass
+            self._msg_queue.put_nowait(raw)
+
+    async def _consume_messages(self):
+        """从有界队列逐条消费并处理消息"""
+        while True:
+            raw = await self._msg_queue.get()
+            try:
+                await self._on_websocket_message(raw)
+            except Exception as e:
+                _LOGGER.error("消费WebSocket消息异常: %s", e)
 
     async def _listen_messages(self):
         """监听WebSocket消息"""
         try:
             async for msg in self.websocket:
-                if msg.type == WSMsgType.TEXT:
-                    await self._on_websocket_message(msg.data)
+                # TEXT与BINARY都入队：orjson对str/bytes同样可解析，
+                # bytes路径还省去aiohttp的UTF-8解码
+                if msg.type == WSMsgType.TEXT or msg.type == WSMsgType.BINARY:
+                    # 心跳帧最频繁且无需处理，解析前直接丢弃
+                    if not _is_ping(msg.data):
+                        self._enqueue_message(msg.data)
                 elif msg.type == WSMsgType.ERROR:
                     await self._on_websocket_error(self.websocket.exception())
                     break
@@ -314,7 +413,9 @@ class MindorWebSocketClient:
         except Exception as e:
             _LOGGER.error(f"WebSocket消息监听异常: {e}")
         finally:
-            self.is_connected = False
+            # 主动断开保持CLOSED；异常退出转入重连中状态
+            if self._state == _State.OPEN:
+                self._state = _State.RECONNECTING
 
     async def connect_websocket(self):
         """连接WebSocket（重连入口）"""
@@ -322,16 +423,17 @@ class MindorWebSocketClient:
 
     async def disconnect(self):
         """断开WebSocket连接"""
-        self.is_reconnect = True
-        self.is_connected = False
+        # 终态：之后的close/error回调都不再触发重连
+        self._state = _State.CLOSED
 
         # 取消定时器
-        if self.reconnect_timer:
-            self.reconnect_timer.cancel()
         if self.connect_timer:
             self.connect_timer.cancel()
+        for timer in self._status_timers.values():
+            timer.cancel()
+        self._status_timers.clear()
 
-        # 取消监听任务
+        # 取消监听与消费任务
         if self._listen_task:
             self._listen_task.cancel()
             try:
@@ -340,12 +442,20 @@ class MindorWebSocketClient:
                 pass
             self._listen_task = None
 
+        if self._consume_task:
+            self._consume_task.cancel()
+            try:
+                await self._consume_task
+            except asyncio.CancelledError:
+                pass
+            self._consume_task = None
+
         # 关闭连接
         if self.websocket:
             await self.websocket.close()
             self.websocket = None
 
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
             self.session = None
 
@@ -354,16 +464,31 @@ class MindorWebSocketClient:
     def update_equipment_list(self, equipment_list: List[Dict]):
         """更新设备列表"""
         self.equipment_list = equipment_list
-        # 初始化处理信息
-        for device in equipment_list:
-            device_id = device.get("device_id")
-            if device_id:
-                if device_id not in self.handle_info:
-                    self.handle_info[device_id] = []
-                status_key = f"{device_id}_status"
-                if status_key not in self.handle_info:
-                    self.handle_info[status_key] = []
+        # 列表重新赋值时同步重建热路径状态，按新列表字段重新播种
+        self._states = {
+            d["device_id"]: DeviceState(
+                is_on=bool(d.get("isOn", False)),
+                online=bool(d.get("online", False)),
+                is_operation=bool(d.get("isOperation", False)),
+            )
+            for d in equipment_list
+            if d.get("device_id")
+        }
+        self._status_key = {
+            device_id: device_id + "_status" for device_id in self._states
+        }
+        # 初始化处理信息（setdefault单次查找，已有列表原样保留）
+        for device_id, status_key in self._status_key.items():
+            self.handle_info.setdefault(device_id, [])
+            # 状态帧用有界环形缓冲，回调迟到/丢失时也不会无限增长
+            self.handle_info.setdefault(status_key, deque(maxlen=64))
 
     def get_equipment_list(self) -> List[Dict]:
-        """获取当前设备列表"""
+        """获取当前设备列表（把热路径状态投影回元数据dict）"""
+        for device in self.equipment_list:
+            state = self._states.get(device.get("device_id"))
+            if state is not None:
+                device["isOn"] = state.is_on
+                device["online"] = state.online
+                device["isOperation"] = state.is_operation
         return self.equipment_list